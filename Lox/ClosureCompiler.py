@@ -0,0 +1,582 @@
+import operator
+from Lox.Stmt import StmtVisitor
+from Lox.SyntaxTree import ExprVisitor, Call, Get, Super
+from Lox.TokenType import TokenType
+from Lox.Interpreter import Interpreter
+from Lox.LoxFunction import LoxFunction, LoxBoundMethod, MAX_CALL_DEPTH
+from Lox.LoxInstance import LoxInstance
+from Lox.LoxCallable import LoxCallable, define_natives
+from Lox.LoxClass import LoxClass
+from Lox.LoxCollections import NativeObject
+from Lox.Enviorment import Environment, GlobalEnvironment
+from Lox.Output import Output
+from LoxErrors.Error import global_errors
+from LoxErrors.RuntimeException import RuntimeException
+
+
+is_truthy = Interpreter.is_truthy
+is_equal = Interpreter.is_equal
+stringify = Interpreter.stringify
+
+NUMBER_OPERATORS = {
+    TokenType.MINUS: operator.sub,
+    TokenType.SLASH: operator.truediv,
+    TokenType.STAR: operator.mul,
+    TokenType.MODULO: operator.mod,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+}
+
+
+class CompiledFunction(LoxFunction):
+    __slots__ = ('body',)
+
+    def __init__(self, declaration, closure, is_init, body):
+        super().__init__(declaration, closure, is_init)
+        self.body = body
+
+    def call(self, interpreter, arguments):
+        return interpreter.execute_call(self, Environment(self.closure, arguments))
+
+    def invoke(self, interpreter, instance, arguments):
+        environment = Environment(self.closure, [instance, *arguments])
+        return interpreter.execute_call(self, environment, instance if self.isInit else None)
+
+
+class ClosureInterpreter:
+    def __init__(self, output=None, errors=None):
+        self.globals = GlobalEnvironment()
+        define_natives(self.globals)
+        self.output = Output() if output is None else output
+        self.errors = global_errors if errors is None else errors
+        self.call_depth = 0
+
+    def interpret(self, statements, flush=True):
+        compiler = ClosureCompiler(self)
+        compiled = [compiler.compile(statement) for statement in statements if statement is not None]
+        try:
+            for statement in compiled:
+                statement(self.globals)
+        except RuntimeException as error:
+            self.output.flush()
+            self.errors.runtime_error(error)
+        finally:
+            if flush:
+                self.output.flush()
+
+    def execute_call(self, function, environment, default=None):
+        # Runs the body of a compiled function, returning default if it ends
+        # without a 'return'. A tail call completes the body with the next
+        # function and its environment, which then run in this same loop.
+        if self.call_depth >= MAX_CALL_DEPTH:
+            raise RuntimeException(function.declaration.name, "Stack overflow.")
+
+        self.call_depth += 1
+        try:
+            while True:
+                for statement in function.body:
+                    completion = statement(environment)
+                    if completion is not None:
+                        break
+                else:
+                    return default
+
+                if len(completion) == 1:
+                    return completion[0]
+                function, environment = completion
+                default = None
+        except RecursionError:
+            # Deeply nested expressions can use up Python's stack first.
+            raise RuntimeException(function.declaration.name, "Stack overflow.")
+        finally:
+            self.call_depth -= 1
+
+
+class ClosureCompiler(StmtVisitor, ExprVisitor):
+    # Every node is visited once and turned into a Python closure taking the
+    # current Environment. Expression closures return their value; statement
+    # closures return None, a 1-tuple holding the value of a 'return', or for
+    # a 'return' of a call to a compiled function, the function and the
+    # environment to run it in.
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.globals = interpreter.globals
+
+    def compile(self, node):
+        return node.accept(self)
+
+    def compile_body(self, statements):
+        return [statement.accept(self) for statement in statements]
+
+    def visit_expression_stmt(self, stmt):
+        expression = self.compile(stmt.expression)
+
+        def execute(environment):
+            expression(environment)
+
+        return execute
+
+    def visit_print_stmt(self, stmt):
+        expression = self.compile(stmt.expression)
+        write_line = self.interpreter.output.write_line
+
+        def execute(environment):
+            write_line(stringify(expression(environment)))
+
+        return execute
+
+    def visit_var_stmt(self, stmt):
+        name = stmt.name.lexem
+        if stmt.initializer is None:
+            def execute(environment):
+                environment.define(name, None)
+        else:
+            initializer = self.compile(stmt.initializer)
+
+            def execute(environment):
+                environment.define(name, initializer(environment))
+
+        return execute
+
+    def visit_block_stmt(self, stmt):
+        body = self.compile_body(stmt.statements)
+
+        if not stmt.has_scope:
+            def execute(environment):
+                for statement in body:
+                    completion = statement(environment)
+                    if completion is not None:
+                        return completion
+
+            return execute
+
+        def execute(environment):
+            inner = Environment(environment)
+            for statement in body:
+                completion = statement(inner)
+                if completion is not None:
+                    return completion
+
+        return execute
+
+    def visit_if_stmt(self, stmt):
+        condition = self.compile(stmt.condition)
+        then_branch = self.compile(stmt.then_branch)
+
+        if stmt.else_branch is None:
+            def execute(environment):
+                if is_truthy(condition(environment)):
+                    return then_branch(environment)
+        else:
+            else_branch = self.compile(stmt.else_branch)
+
+            def execute(environment):
+                if is_truthy(condition(environment)):
+                    return then_branch(environment)
+                return else_branch(environment)
+
+        return execute
+
+    def visit_while_stmt(self, stmt):
+        condition = self.compile(stmt.condition)
+        body = self.compile(stmt.body)
+
+        def execute(environment):
+            while is_truthy(condition(environment)):
+                completion = body(environment)
+                if completion is not None:
+                    return completion
+
+        return execute
+
+    def visit_function_stmt(self, stmt):
+        name = stmt.name.lexem
+        body = self.compile_body(stmt.body)
+
+        def execute(environment):
+            environment.define(name, CompiledFunction(stmt, environment, False, body))
+
+        return execute
+
+    def visit_return_stmt(self, stmt):
+        if type(stmt.value) is Call:
+            return self.return_call(stmt.value)
+
+        if stmt.value is None:
+            def execute(environment):
+                return (None,)
+        else:
+            value = self.compile(stmt.value)
+
+            def execute(environment):
+                return (value(environment),)
+
+        return execute
+
+    def return_call(self, expr):
+        # The checks and evaluation order are those of visit_call_expr.
+        site = expr.callee
+        if type(site) is Get:
+            object_expression = self.compile(site.object)
+
+            def find_callee(environment):
+                object = object_expression(environment)
+                if type(object) is LoxInstance:
+                    if not object.shape is site.cache_shape:
+                        object.fill_cache(site)
+                    if site.cache_method is None:
+                        return object.values[site.cache_field], None
+                    return site.cache_method, object
+                elif isinstance(object, NativeObject):
+                    return object.get(site.name), None
+                raise RuntimeException(site.name, "Only instances have properties.")
+        elif type(site) is Super:
+            find_callee = self.super_method(site)
+        else:
+            callee = self.compile(site)
+
+            def find_callee(environment):
+                return callee(environment), None
+
+        arguments = [self.compile(argument) for argument in expr.arguments]
+        paren = expr.paren
+        interpreter = self.interpreter
+
+        def execute(environment):
+            function, receiver = find_callee(environment)
+            values = [argument(environment) for argument in arguments]
+
+            if not isinstance(function, LoxCallable):
+                raise RuntimeException(paren, "Can only call functions and classes.")
+
+            if not len(values) == function.arity():
+                raise RuntimeException(paren, f"Expected {function.arity()} arguments but got {len(values)}.")
+
+            if type(function) is LoxBoundMethod:
+                receiver = function.receiver
+                function = function.method
+
+            # An initializer yields its instance, so it is called as usual.
+            if type(function) is CompiledFunction and not function.isInit:
+                if receiver is not None:
+                    values.insert(0, receiver)
+                return function, Environment(function.closure, values)
+            if receiver is not None:
+                return (function.invoke(interpreter, receiver, values),)
+            return (function.call(interpreter, values),)
+
+        return execute
+
+    def visit_class_stmt(self, stmt):
+        name = stmt.name
+        superclass_token = stmt.superclass.name if stmt.superclass is not None else None
+        superclass_expression = self.compile(stmt.superclass) if stmt.superclass is not None else None
+        methods = [(method, self.compile_body(method.body)) for method in stmt.methods]
+
+        def execute(environment):
+            superclass = None
+            if superclass_expression is not None:
+                superclass = superclass_expression(environment)
+                if not type(superclass) == LoxClass:
+                    raise RuntimeException(superclass_token, "Superclass must be a class.")
+
+            method_environment = environment
+            if superclass is not None:
+                method_environment = Environment(environment, [superclass])
+
+            functions = {}
+            for method, body in methods:
+                is_init = method.name.lexem == "init"
+                functions[method.name.lexem] = CompiledFunction(method, method_environment, is_init, body)
+
+            environment.define(name.lexem, LoxClass(name.lexem, superclass, functions))
+
+        return execute
+
+    def visit_assign_expr(self, expr):
+        value = self.compile(expr.value)
+        name = expr.name
+
+        if expr.depth is None:
+            globals = self.globals
+
+            def evaluate(environment):
+                result = value(environment)
+                globals.assign(name, result)
+                return result
+
+            return evaluate
+
+        distance = expr.depth
+        slot = expr.slot
+        if distance == 0:
+            def evaluate(environment):
+                result = value(environment)
+                environment.values[slot] = result
+                return result
+        else:
+            def evaluate(environment):
+                result = value(environment)
+                environment.ancestor(distance).values[slot] = result
+                return result
+
+        return evaluate
+
+    def visit_binary_expr(self, expr):
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+        token = expr.operator
+        operator_type = token.type
+
+        if operator_type == TokenType.PLUS:
+            def evaluate(environment):
+                a = left(environment)
+                b = right(environment)
+                if type(a) == float and type(b) == float:
+                    return a + b
+                elif (type(a) == str or type(a) == float) and (type(b) == str or type(b) == float):
+                    return str(a) + str(b)
+                raise RuntimeException(token, "Operators must be two numbers or strings.")
+        elif operator_type == TokenType.EQUAL_EQUAL:
+            def evaluate(environment):
+                return is_equal(left(environment), right(environment))
+        elif operator_type == TokenType.BANG_EQUAL:
+            def evaluate(environment):
+                return not is_equal(left(environment), right(environment))
+        else:
+            number_operator = NUMBER_OPERATORS[operator_type]
+
+            def evaluate(environment):
+                a = left(environment)
+                b = right(environment)
+                if type(a) == float and type(b) == float:
+                    return number_operator(a, b)
+                raise RuntimeException(token, "Operands must be a number.")
+
+        return evaluate
+
+    def visit_call_expr(self, expr):
+        if type(expr.callee) is Get:
+            return self.method_call(expr)
+        if type(expr.callee) is Super:
+            return self.super_call(expr)
+
+        callee = self.compile(expr.callee)
+        arguments = [self.compile(argument) for argument in expr.arguments]
+        paren = expr.paren
+        interpreter = self.interpreter
+
+        def evaluate(environment):
+            function = callee(environment)
+            values = [argument(environment) for argument in arguments]
+
+            if not isinstance(function, LoxCallable):
+                raise RuntimeException(paren, "Can only call functions and classes.")
+
+            if not len(values) == function.arity():
+                raise RuntimeException(paren, f"Expected {function.arity()} arguments but got {len(values)}.")
+
+            return function.call(interpreter, values)
+
+        return evaluate
+
+    def method_call(self, expr):
+        # Invokes a method with its receiver directly instead of allocating a
+        # bound method that is called once and dropped.
+        site = expr.callee
+        object_expression = self.compile(site.object)
+        arguments = [self.compile(argument) for argument in expr.arguments]
+        paren = expr.paren
+        interpreter = self.interpreter
+
+        def evaluate(environment):
+            object = object_expression(environment)
+            if type(object) is LoxInstance:
+                if not object.shape is site.cache_shape:
+                    object.fill_cache(site)
+                method = site.cache_method
+                function = object.values[site.cache_field] if method is None else method
+            elif isinstance(object, NativeObject):
+                method = None
+                function = object.get(site.name)
+            else:
+                raise RuntimeException(site.name, "Only instances have properties.")
+            values = [argument(environment) for argument in arguments]
+
+            if not isinstance(function, LoxCallable):
+                raise RuntimeException(paren, "Can only call functions and classes.")
+
+            if not len(values) == function.arity():
+                raise RuntimeException(paren, f"Expected {function.arity()} arguments but got {len(values)}.")
+
+            if method is None:
+                return function.call(interpreter, values)
+            return method.invoke(interpreter, object, values)
+
+        return evaluate
+
+    def super_call(self, expr):
+        find_method = self.super_method(expr.callee)
+        arguments = [self.compile(argument) for argument in expr.arguments]
+        paren = expr.paren
+        interpreter = self.interpreter
+
+        def evaluate(environment):
+            method, object = find_method(environment)
+            values = [argument(environment) for argument in arguments]
+
+            if not len(values) == method.arity():
+                raise RuntimeException(paren, f"Expected {method.arity()} arguments but got {len(values)}.")
+
+            return method.invoke(interpreter, object, values)
+
+        return evaluate
+
+    def visit_get_expr(self, expr):
+        object_expression = self.compile(expr.object)
+        name = expr.name
+
+        def evaluate(environment):
+            object = object_expression(environment)
+            if type(object) is LoxInstance:
+                if object.shape is expr.cache_shape:
+                    if expr.cache_method is None:
+                        return object.values[expr.cache_field]
+                    return object.bind(expr.cache_method)
+                return object.get_cached(expr)
+            elif isinstance(object, NativeObject):
+                return object.get(name)
+            raise RuntimeException(name, "Only instances have properties.")
+
+        return evaluate
+
+    def visit_grouping_expr(self, expr):
+        return self.compile(expr.expression)
+
+    def visit_literal_expr(self, expr):
+        value = expr.value
+
+        def evaluate(environment):
+            return value
+
+        return evaluate
+
+    def visit_logic_expr(self, expr):
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+
+        if expr.operator.type == TokenType.OR:
+            def evaluate(environment):
+                value = left(environment)
+                if is_truthy(value):
+                    return value
+                return right(environment)
+        else:
+            def evaluate(environment):
+                value = left(environment)
+                if not is_truthy(value):
+                    return value
+                return right(environment)
+
+        return evaluate
+
+    def visit_set_expr(self, expr):
+        object_expression = self.compile(expr.object)
+        value_expression = self.compile(expr.value)
+        name = expr.name
+
+        def evaluate(environment):
+            object = object_expression(environment)
+            if not type(object) is LoxInstance:
+                raise RuntimeException(name, "Only instances have fields.")
+
+            value = value_expression(environment)
+            if object.shape is expr.cache_shape:
+                if expr.cache_transition is None:
+                    object.values[expr.cache_field] = value
+                else:
+                    object.shape = expr.cache_transition
+                    object.values.append(value)
+            else:
+                object.set_cached(expr, value)
+            return value
+
+        return evaluate
+
+    def visit_super_expr(self, expr):
+        find_method = self.super_method(expr)
+
+        def evaluate(environment):
+            method, object = find_method(environment)
+            return object.bind(method)
+
+        return evaluate
+
+    def super_method(self, expr):
+        distance = expr.depth
+        slot = expr.slot
+        method_name = expr.method
+
+        def find_method(environment):
+            superclass = environment.get_at(distance, slot)
+            object = environment.get_at(distance - 1, 0)
+
+            method = superclass.find_method(method_name.lexem)
+            if method is None:
+                raise RuntimeException(method_name, f"Undefined property {method_name.lexem}.")
+
+            return method, object
+
+        return find_method
+
+    def visit_this_expr(self, expr):
+        return self.variable(expr.keyword, expr)
+
+    def visit_unary_expr(self, expr):
+        right = self.compile(expr.right)
+        token = expr.operator
+
+        if token.type == TokenType.MINUS:
+            def evaluate(environment):
+                value = right(environment)
+                if type(value) == float:
+                    return -value
+                raise RuntimeException(token, "Operand must be a number.")
+        else:
+            def evaluate(environment):
+                return not is_truthy(right(environment))
+
+        return evaluate
+
+    def visit_variable_expr(self, expr):
+        return self.variable(expr.name, expr)
+
+    def variable(self, name, expr):
+        if expr.depth is None:
+            globals = self.globals
+            values = globals.values
+            lexem = name.lexem
+
+            def evaluate(environment):
+                try:
+                    return values[lexem]
+                except KeyError:
+                    return globals.get(name)
+
+            return evaluate
+
+        distance = expr.depth
+        slot = expr.slot
+        if distance == 0:
+            def evaluate(environment):
+                return environment.values[slot]
+        elif distance == 1:
+            def evaluate(environment):
+                return environment.enclosing.values[slot]
+        else:
+            def evaluate(environment):
+                return environment.ancestor(distance).values[slot]
+
+        return evaluate
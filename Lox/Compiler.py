@@ -0,0 +1,255 @@
+from array import array
+from Lox.Stmt import StmtVisitor
+from Lox.SyntaxTree import ExprVisitor, Get, Super
+from Lox.TokenType import TokenType
+from Lox import OpCode
+
+
+BINARY_OPCODES = {
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.SLASH: OpCode.DIVIDE,
+    TokenType.STAR: OpCode.MULTIPLY,
+    TokenType.MODULO: OpCode.MODULO,
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+}
+
+
+class Chunk:
+    def __init__(self):
+        self.code = array('i')
+        self.constants = []
+
+    def disassemble(self):
+        lines = []
+        offset = 0
+        while offset < len(self.code):
+            op = self.code[offset]
+            count = OpCode.OPERANDS.get(op, 0)
+            operands = self.code[offset + 1: offset + 1 + count].tolist()
+            lines.append(f'{offset:04d} {OpCode.NAMES[op]} {" ".join(str(o) for o in operands)}'.rstrip())
+            offset += 1 + count
+        return '\n'.join(lines)
+
+
+class FunctionProto:
+    def __init__(self, declaration, chunk):
+        self.declaration = declaration
+        self.chunk = chunk
+
+
+class ClassProto:
+    def __init__(self, declaration, methods):
+        self.declaration = declaration
+        # List of (FunctionProto, is_init)
+        self.methods = methods
+
+
+class Compiler(StmtVisitor, ExprVisitor):
+    def __init__(self):
+        self.chunk = None
+
+    def compile(self, statements):
+        self.chunk = Chunk()
+        for statement in statements:
+            statement.accept(self)
+
+        self.emit(OpCode.NIL)
+        self.emit(OpCode.RETURN)
+        return self.chunk
+
+    def compile_function(self, declaration, is_init):
+        enclosing = self.chunk
+        self.chunk = Chunk()
+
+        for statement in declaration.body:
+            statement.accept(self)
+
+        # Falling off the end of an initializer returns 'this', the first
+        # slot of a method's frame.
+        if is_init:
+            self.emit(OpCode.GET_LOCAL, 0, 0)
+        else:
+            self.emit(OpCode.NIL)
+        self.emit(OpCode.RETURN)
+
+        proto = FunctionProto(declaration, self.chunk)
+        self.chunk = enclosing
+        return proto
+
+    def emit(self, *code):
+        self.chunk.code.extend(code)
+
+    def emit_jump(self, op):
+        self.emit(op, -1)
+        return len(self.chunk.code) - 1
+
+    def patch_jump(self, operand):
+        self.chunk.code[operand] = len(self.chunk.code)
+
+    def make_constant(self, value):
+        self.chunk.constants.append(value)
+        return len(self.chunk.constants) - 1
+
+    def visit_expression_stmt(self, stmt):
+        stmt.expression.accept(self)
+        self.emit(OpCode.POP)
+
+    def visit_print_stmt(self, stmt):
+        stmt.expression.accept(self)
+        self.emit(OpCode.PRINT)
+
+    def visit_var_stmt(self, stmt):
+        if stmt.initializer is not None:
+            stmt.initializer.accept(self)
+        else:
+            self.emit(OpCode.NIL)
+        self.emit(OpCode.DEFINE, self.make_constant(stmt.name.lexem))
+
+    def visit_block_stmt(self, stmt):
+        if not stmt.has_scope:
+            for statement in stmt.statements:
+                statement.accept(self)
+            return
+
+        self.emit(OpCode.PUSH_ENV)
+        for statement in stmt.statements:
+            statement.accept(self)
+        self.emit(OpCode.POP_ENV)
+
+    def visit_if_stmt(self, stmt):
+        stmt.condition.accept(self)
+        else_jump = self.emit_jump(OpCode.JUMP_IF_FALSE)
+        stmt.then_branch.accept(self)
+
+        if stmt.else_branch is not None:
+            end_jump = self.emit_jump(OpCode.JUMP)
+            self.patch_jump(else_jump)
+            stmt.else_branch.accept(self)
+            self.patch_jump(end_jump)
+        else:
+            self.patch_jump(else_jump)
+
+    def visit_while_stmt(self, stmt):
+        loop_start = len(self.chunk.code)
+        stmt.condition.accept(self)
+        exit_jump = self.emit_jump(OpCode.JUMP_IF_FALSE)
+        stmt.body.accept(self)
+        self.emit(OpCode.JUMP, loop_start)
+        self.patch_jump(exit_jump)
+
+    def visit_function_stmt(self, stmt):
+        proto = self.compile_function(stmt, False)
+        self.emit(OpCode.CLOSURE, self.make_constant(proto))
+        self.emit(OpCode.DEFINE, self.make_constant(stmt.name.lexem))
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is not None:
+            stmt.value.accept(self)
+        else:
+            self.emit(OpCode.NIL)
+        self.emit(OpCode.RETURN)
+
+    def visit_class_stmt(self, stmt):
+        if stmt.superclass is not None:
+            stmt.superclass.accept(self)
+
+        methods = []
+        for method in stmt.methods:
+            is_init = method.name.lexem == "init"
+            methods.append((self.compile_function(method, is_init), is_init))
+
+        self.emit(OpCode.CLASS, self.make_constant(ClassProto(stmt, methods)))
+
+    def visit_assign_expr(self, expr):
+        expr.value.accept(self)
+
+        if expr.depth is not None:
+            self.emit(OpCode.SET_LOCAL, expr.depth, expr.slot)
+        else:
+            self.emit(OpCode.SET_GLOBAL, self.make_constant(expr.name))
+
+    def visit_binary_expr(self, expr):
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+        operator_type = expr.operator.type
+        if operator_type == TokenType.EQUAL_EQUAL:
+            self.emit(OpCode.EQUAL)
+        elif operator_type == TokenType.BANG_EQUAL:
+            self.emit(OpCode.NOT_EQUAL)
+        else:
+            self.emit(BINARY_OPCODES[operator_type], self.make_constant(expr.operator))
+
+    def visit_call_expr(self, expr):
+        callee = expr.callee
+        if type(callee) is Get:
+            callee.object.accept(self)
+            self.emit(OpCode.GET_METHOD, self.make_constant(callee))
+            call = OpCode.INVOKE
+        elif type(callee) is Super:
+            self.emit(OpCode.GET_SUPER_METHOD, callee.depth, callee.slot, self.make_constant(callee.method))
+            call = OpCode.INVOKE
+        else:
+            callee.accept(self)
+            call = OpCode.CALL
+
+        for argument in expr.arguments:
+            argument.accept(self)
+
+        self.emit(call, len(expr.arguments), self.make_constant(expr.paren))
+
+    def visit_get_expr(self, expr):
+        expr.object.accept(self)
+        self.emit(OpCode.GET_PROPERTY, self.make_constant(expr))
+
+    def visit_grouping_expr(self, expr):
+        expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr):
+        if expr.value is None:
+            self.emit(OpCode.NIL)
+        elif expr.value is True:
+            self.emit(OpCode.TRUE)
+        elif expr.value is False:
+            self.emit(OpCode.FALSE)
+        else:
+            self.emit(OpCode.CONSTANT, self.make_constant(expr.value))
+
+    def visit_logic_expr(self, expr):
+        expr.left.accept(self)
+        end_jump = self.emit_jump(OpCode.OR_JUMP if expr.operator.type == TokenType.OR else OpCode.AND_JUMP)
+        expr.right.accept(self)
+        self.patch_jump(end_jump)
+
+    def visit_set_expr(self, expr):
+        # The interpreter rejects a non-instance before evaluating the value.
+        expr.object.accept(self)
+        self.emit(OpCode.CHECK_FIELDS, self.make_constant(expr.name))
+        expr.value.accept(self)
+        self.emit(OpCode.SET_PROPERTY, self.make_constant(expr))
+
+    def visit_super_expr(self, expr):
+        self.emit(OpCode.GET_SUPER, expr.depth, expr.slot, self.make_constant(expr.method))
+
+    def visit_this_expr(self, expr):
+        self.variable(expr.keyword, expr)
+
+    def visit_unary_expr(self, expr):
+        expr.right.accept(self)
+        if expr.operator.type == TokenType.MINUS:
+            self.emit(OpCode.NEGATE, self.make_constant(expr.operator))
+        else:
+            self.emit(OpCode.NOT)
+
+    def visit_variable_expr(self, expr):
+        self.variable(expr.name, expr)
+
+    def variable(self, name, expr):
+        if expr.depth is not None:
+            self.emit(OpCode.GET_LOCAL, expr.depth, expr.slot)
+        else:
+            self.emit(OpCode.GET_GLOBAL, self.make_constant(name))
@@ -2,15 +2,20 @@ from LoxErrors.RuntimeException import RuntimeException
 
 
 class Environment:
-    def __init__(self, enclosing=None):
-        self.values = {}
+    # A local scope. Each variable lives at the slot the Resolver assigned
+    # it, which is its position in declaration order within the scope.
+    __slots__ = ('values', 'enclosing')
+
+    def __init__(self, enclosing=None, values=None):
+        self.values = [] if values is None else values
         self.enclosing = enclosing
 
     def define(self, name, value):
-        self.values[name] = value
+        # Slots are handed out in declaration order, so defining appends.
+        self.values.append(value)
 
-    def get_at(self, distance, name):
-        return self.ancestor(distance).values[name]
+    def get_at(self, distance, slot):
+        return self.ancestor(distance).values[slot]
 
     def ancestor(self, distance):
         environment = self
@@ -19,25 +24,30 @@ class Environment:
 
         return environment
 
+    def assign_at(self, distance, slot, value):
+        self.ancestor(distance).values[slot] = value
+
+
+class GlobalEnvironment:
+    # Globals are not resolved statically, so they are still looked up by name.
+    __slots__ = ('values', 'enclosing')
+
+    def __init__(self):
+        self.values = {}
+        self.enclosing = None
+
+    def define(self, name, value):
+        self.values[name] = value
+
     def get(self, name):
         if name.lexem in self.values.keys():
             return self.values[name.lexem]
 
-        if self.enclosing is not None:
-            return self.enclosing.get(name)
-
         raise RuntimeException(name, f"Undefined variable '{name.lexem}'.")
 
-    def assign_at(self, distance, name, value):
-        self.ancestor(distance).values[name.lexem] = value
-
     def assign(self, name, value):
         if name.lexem in self.values.keys():
             self.values[name.lexem] = value
             return
 
-        if self.enclosing is not None:
-            self.enclosing.assign(name, value)
-            return
-
         raise RuntimeException(name, f"Undefined variable '{name.lexem}'.")
@@ -0,0 +1,101 @@
+import re
+from LoxErrors.Error import global_errors
+from Lox.TokenType import TokenType
+from Lox.Scanner import Token, keywords_init
+
+
+# Each match is one lexeme with the blanks before it skipped. Identifiers
+# start with a letter or '_' as in Scanner, a string without its closing
+# quote is unterminated, and any other character is matched on its own so
+# it can be reported as unexpected. Blanks are never matched as a lexeme, so
+# those at the end of the source are skipped rather than reported.
+LEXEME = re.compile(r'[ \t\r]*(\n|//[^\n]*|[^\W\d]\w*|\d+(?:\.\d+)?|"[^"]*"?|[!=<>]=?|[^ \t\r])')
+
+OPERATORS = {
+    '(': TokenType.LEFT_PAREN, ')': TokenType.RIGHT_PAREN, '{': TokenType.LEFT_BRACE, '}': TokenType.RIGHT_BRACE,
+    ',': TokenType.COMMA, '.': TokenType.DOT, '-': TokenType.MINUS, '%': TokenType.MODULO, '+': TokenType.PLUS,
+    ';': TokenType.SEMICOLON, '*': TokenType.STAR, '/': TokenType.SLASH,
+    '!': TokenType.BANG, '!=': TokenType.BANG_EQUAL, '=': TokenType.EQUAL, '==': TokenType.EQUAL_EQUAL,
+    '<': TokenType.LESS, '<=': TokenType.LESS_EQUAL, '>': TokenType.GREATER, '>=': TokenType.GREATER_EQUAL,
+}
+
+
+def read_chunks(file, size=65536):
+    return iter(lambda: file.read(size), '')
+
+
+def fixed_lexemes_init():
+    # Lexemes whose token type depends only on their text.
+    fixed = dict(OPERATORS)
+    fixed.update(keywords_init())
+    return fixed
+
+
+class FastScanner:
+    # Produces the same tokens and errors as Scanner. The regular expression
+    # finds every lexeme in one pass over the source and a table lookup
+    # classifies most of them, instead of a method call per character.
+    # 'source' is the program text, or for stream_tokens an iterable of
+    # pieces of it such as read_chunks(file).
+    def __init__(self, source, errors=None):
+        self.source = source
+        self.errors = global_errors if errors is None else errors
+        self.tokens = []
+        self.fixed = fixed_lexemes_init()
+        self.line = 1
+
+    def scan_tokens(self):
+        self.tokens.extend(self.scan(self.source, True))
+        self.tokens.append(Token(TokenType.EOF, "", None, self.line))
+        return self.tokens
+
+    def stream_tokens(self):
+        pending = ''
+        for chunk in self.source:
+            pending += chunk
+            # Complete lines can be scanned, apart from a string literal
+            # still open at their end, which is returned to wait for more.
+            end = pending.rfind('\n') + 1
+            if end:
+                unterminated = yield from self.scan(pending[:end], False)
+                pending = unterminated + pending[end:]
+
+        yield from self.scan(pending, True)
+        yield Token(TokenType.EOF, "", None, self.line)
+
+    def scan(self, source, final):
+        fixed = self.fixed.get
+        line = self.line
+
+        for text in LEXEME.findall(source):
+            token_type = fixed(text)
+            if token_type is not None:
+                yield Token(token_type, text, None, line)
+                continue
+
+            c = text[0]
+            if c == '\n':
+                line += 1
+            elif c == '_' or c.isalpha():
+                yield Token(TokenType.IDENTIFIER, text, None, line)
+            elif c.isdigit():
+                yield Token(TokenType.NUMBER, text, float(text), line)
+            elif c == '"':
+                if len(text) > 1 and text[-1] == '"':
+                    line += text.count('\n')
+                    yield Token(TokenType.STRING, text, text[1:-1], line)
+                elif final:
+                    line += text.count('\n')
+                    self.errors.report(line, "", "Unterminated string.")
+                else:
+                    # An unclosed string runs to the end of the source.
+                    self.line = line
+                    return text
+            elif c == '/':
+                # A comment; a lone '/' was found in the table.
+                continue
+            else:
+                self.errors.report(line, "", "Unexpected character.")
+
+        self.line = line
+        return ''
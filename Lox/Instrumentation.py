@@ -0,0 +1,67 @@
+from Lox.Interpreter import Interpreter
+from Lox.Enviorment import Environment
+
+
+# Attributes that hold a node's own token, then those that hold the child
+# nodes it starts with, in the order line_of looks at them.
+TOKEN_ATTRIBUTES = ('keyword', 'name', 'operator', 'paren')
+CHILD_ATTRIBUTES = ('expression', 'condition', 'fallback', 'callee', 'object', 'left', 'value')
+
+
+def line_of(node):
+    for attribute in TOKEN_ATTRIBUTES:
+        token = getattr(node, attribute, None)
+        if token is not None and hasattr(token, 'line'):
+            return token.line
+
+    for attribute in CHILD_ATTRIBUTES:
+        child = getattr(node, attribute, None)
+        if child is not None:
+            line = line_of(child)
+            if line is not None:
+                return line
+
+    for statement in getattr(node, 'statements', ()):
+        line = line_of(statement)
+        if line is not None:
+            return line
+
+    return None
+
+
+class InstrumentedInterpreter(Interpreter):
+    # Base for interpreters that watch the program run. Interpreter runs the
+    # statements of blocks and function bodies straight through accept();
+    # here every statement goes through execute() so that subclasses can
+    # hook it, along with evaluate() and execute_call().
+    def __init__(self, output=None, errors=None):
+        super().__init__(output, errors)
+        # Dict<Stmt or Expr, int>
+        self.node_lines = {}
+
+    def line(self, node):
+        line = self.node_lines.get(node)
+        if line is None:
+            line = self.node_lines[node] = line_of(node) or 0
+        return line
+
+    def execute_block(self, statements, environment):
+        previous = self.environment
+
+        try:
+            self.environment = environment
+
+            for statement in statements:
+                if self.execute(statement):
+                    return True
+        finally:
+            self.environment = previous
+
+    def visit_block_stmt(self, stmt):
+        if stmt.has_scope:
+            return self.execute_block(stmt.statements, Environment(self.environment))
+
+        for statement in stmt.statements:
+            if self.execute(statement):
+                return True
+        return None
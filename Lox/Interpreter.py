@@ -1,33 +1,45 @@
 from Lox.Stmt import StmtVisitor
-from Lox.SyntaxTree import ExprVisitor
+from Lox.SyntaxTree import ExprVisitor, Call, Get, Super
 from Lox.TokenType import TokenType
-from Lox.LoxFunction import LoxFunction
+from Lox.LoxFunction import LoxFunction, LoxBoundMethod, MAX_CALL_DEPTH
 from Lox.LoxInstance import LoxInstance
-from Lox.LoxCallable import LoxCallable, Clock, Read, Float
+from Lox.LoxCallable import LoxCallable, define_natives
 from Lox.LoxClass import LoxClass
-from Lox.Enviorment import Environment
-from LoxErrors.Error import Error
+from Lox.LoxCollections import NativeObject
+from Lox.Enviorment import Environment, GlobalEnvironment
+from Lox.Specializer import Specializer, Rope
+from Lox.Output import Output
+from LoxErrors.Error import global_errors
 from LoxErrors.RuntimeException import RuntimeException
-from LoxErrors.ReturnException import Return
 
 
 class Interpreter(ExprVisitor, StmtVisitor):
-    def __init__(self):
-        self.globals = Environment()
-
-        self.globals.define("clock", Clock())
-        self.globals.define("read", Read())
-        self.globals.define("float", Float())
+    def __init__(self, output=None, errors=None):
+        self.globals = GlobalEnvironment()
+        define_natives(self.globals)
+        self.output = Output() if output is None else output
+        self.errors = global_errors if errors is None else errors
         self.environment = self.globals
-        self.locals = {}
-
-    def interpret(self, statements):
+        # Statements return True when a 'return' completed them, leaving the
+        # returned value here for the caller to pick up.
+        self.return_value = None
+        # A 'return' of a call to a Lox function leaves the function and its
+        # environment here instead, for execute_call to run once the
+        # returning frame is gone. Tail calls then loop rather than recurse.
+        self.tail_call = None
+        self.call_depth = 0
+
+    def interpret(self, statements, flush=True):
+        statements = Specializer().specialize(statements)
         try:
             for statement in statements:
-                if statement is not None:
-                    self.execute(statement)
+                self.execute(statement)
         except RuntimeException as error:
-            Error.runtime_error(error)
+            self.output.flush()
+            self.errors.runtime_error(error)
+        finally:
+            if flush:
+                self.output.flush()
 
     def visit_expression_stmt(self, stmt):
         self.evaluate(stmt.expression)
@@ -40,22 +52,26 @@ class Interpreter(ExprVisitor, StmtVisitor):
 
     def visit_if_stmt(self, stmt):
         if self.is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.then_branch)
+            return self.execute(stmt.then_branch)
         elif stmt.else_branch is not None:
-            self.execute(stmt.else_branch)
+            return self.execute(stmt.else_branch)
         else:
             return None
 
     def visit_return_stmt(self, stmt):
+        if type(stmt.value) is Call:
+            return self.return_call(stmt.value)
+
         value = None
         if stmt.value is not None:
             value = self.evaluate(stmt.value)
 
-        raise Return(value)
+        self.return_value = value
+        return True
 
     def visit_print_stmt(self, stmt):
         value = self.evaluate(stmt.expression)
-        print(self.stringify(value))
+        self.output.write_line(self.stringify(value))
         return None
 
     def visit_var_stmt(self, stmt):
@@ -68,20 +84,70 @@ class Interpreter(ExprVisitor, StmtVisitor):
 
     def visit_while_stmt(self, stmt):
         while self.is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.body)
+            if self.execute(stmt.body):
+                return True
+        return None
+
+    def visit_for_loop_stmt(self, stmt):
+        while self.is_truthy(self.evaluate(stmt.condition)):
+            if self.execute(stmt.body):
+                return True
+            self.evaluate(stmt.increment)
+        return None
+
+    def visit_append_local_stmt(self, stmt):
+        values = self.environment.ancestor(stmt.depth).values
+        rope = values[stmt.slot]
+        if type(rope) is str:
+            rope = Rope([rope])
+        elif not type(rope) is Rope:
+            return self.execute(stmt.fallback)
+
+        # With a string on the left, '+' only needs each piece to be a
+        # string or a number.
+        count = len(rope.pieces)
+        pieces = []
+        for operator, piece in stmt.pieces:
+            value = self.evaluate(piece)
+            if type(value) == str:
+                pieces.append(value)
+            elif type(value) == float:
+                pieces.append(str(value))
+            else:
+                raise RuntimeException(operator, "Operators must be two numbers or strings.")
+
+        if not len(rope.pieces) == count:
+            # The pieces appended to this same rope while being evaluated.
+            rope = Rope(rope.pieces[:count])
+        rope.pieces.extend(pieces)
+        values[stmt.slot] = rope
         return None
 
     def visit_assign_expr(self, expr):
         value = self.evaluate(expr.value)
 
-        if self.locals.keys().__contains__(expr):
-            distance = self.locals[expr]
-            self.environment.assign_at(distance, expr.name, value)
+        if expr.depth is not None:
+            self.environment.assign_at(expr.depth, expr.slot, value)
         else:
             self.globals.assign(expr.name, value)
 
         return value
 
+    def visit_increment_local_expr(self, expr):
+        values = self.environment.ancestor(expr.depth).values
+        value = values[expr.slot]
+        if type(value) == float:
+            value = value + expr.delta
+            values[expr.slot] = value
+            return value
+        return self.evaluate(expr.fallback)
+
+    def visit_compare_local_expr(self, expr):
+        value = self.environment.get_at(expr.depth, expr.slot)
+        if type(value) == float:
+            return expr.compare(value, expr.constant)
+        return self.evaluate(expr.fallback)
+
     def visit_binary_expr(self, expr):
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
@@ -124,7 +190,28 @@ class Interpreter(ExprVisitor, StmtVisitor):
             return not self.is_equal(left, right)
 
     def visit_call_expr(self, expr):
-        callee = self.evaluate(expr.callee)
+        # Method calls invoke the method with its receiver directly instead
+        # of allocating a bound method that is called once and dropped.
+        callee_type = type(expr.callee)
+        if callee_type is Get:
+            site = expr.callee
+            object = self.evaluate(site.object)
+            if type(object) is LoxInstance:
+                if not object.shape is site.cache_shape:
+                    object.fill_cache(site)
+                if site.cache_method is not None:
+                    return self.invoke(expr, site.cache_method, object)
+                callee = object.values[site.cache_field]
+            elif isinstance(object, NativeObject):
+                callee = object.get(site.name)
+            else:
+                raise RuntimeException(site.name, "Only instances have properties.")
+        elif callee_type is Super:
+            method, object = self.find_super_method(expr.callee)
+            return self.invoke(expr, method, object)
+        else:
+            callee = self.evaluate(expr.callee)
+
         arguments = []
         for argument in expr.arguments:
             arguments.append(self.evaluate(argument))
@@ -138,9 +225,74 @@ class Interpreter(ExprVisitor, StmtVisitor):
 
         return function.call(self, arguments)
 
+    def return_call(self, expr):
+        # The checks and evaluation order are those of visit_call_expr.
+        receiver = None
+        callee_type = type(expr.callee)
+        if callee_type is Get:
+            site = expr.callee
+            object = self.evaluate(site.object)
+            if type(object) is LoxInstance:
+                if not object.shape is site.cache_shape:
+                    object.fill_cache(site)
+                if site.cache_method is not None:
+                    callee = site.cache_method
+                    receiver = object
+                else:
+                    callee = object.values[site.cache_field]
+            elif isinstance(object, NativeObject):
+                callee = object.get(site.name)
+            else:
+                raise RuntimeException(site.name, "Only instances have properties.")
+        elif callee_type is Super:
+            callee, receiver = self.find_super_method(expr.callee)
+        else:
+            callee = self.evaluate(expr.callee)
+
+        arguments = []
+        for argument in expr.arguments:
+            arguments.append(self.evaluate(argument))
+
+        if not isinstance(callee, LoxCallable):
+            raise RuntimeException(expr.paren, "Can only call functions and classes.")
+
+        if not len(arguments) == callee.arity():
+            raise RuntimeException(expr.paren, f"Expected {callee.arity()} arguments but got {len(arguments)}.")
+
+        if type(callee) is LoxBoundMethod:
+            receiver = callee.receiver
+            callee = callee.method
+
+        # An initializer yields its instance, so it is called as usual.
+        if type(callee) is LoxFunction and not callee.isInit:
+            if receiver is not None:
+                arguments.insert(0, receiver)
+            self.tail_call = (callee, Environment(callee.closure, arguments))
+        elif receiver is not None:
+            self.return_value = callee.invoke(self, receiver, arguments)
+        else:
+            self.return_value = callee.call(self, arguments)
+        return True
+
+    def invoke(self, expr, method, object):
+        arguments = []
+        for argument in expr.arguments:
+            arguments.append(self.evaluate(argument))
+
+        if not len(arguments) == method.arity():
+            raise RuntimeException(expr.paren, f"Expected {method.arity()} arguments but got {len(arguments)}.")
+
+        return method.invoke(self, object, arguments)
+
     def visit_get_expr(self, expr):
         object = self.evaluate(expr.object)
         if type(object) is LoxInstance:
+            if object.shape is expr.cache_shape:
+                if expr.cache_method is None:
+                    return object.values[expr.cache_field]
+                return object.bind(expr.cache_method)
+            return object.get_cached(expr)
+        elif isinstance(object, NativeObject):
             return object.get(expr.name)
         else:
             raise RuntimeException(expr.name, "Only instances have properties.")
@@ -170,19 +322,30 @@ class Interpreter(ExprVisitor, StmtVisitor):
             raise RuntimeException(expr.name, "Only instances have fields.")
 
         value = self.evaluate(expr.value)
-        object.set(expr.name, value)
+        if object.shape is expr.cache_shape:
+            if expr.cache_transition is None:
+                object.values[expr.cache_field] = value
+            else:
+                object.shape = expr.cache_transition
+                object.values.append(value)
+        else:
+            object.set_cached(expr, value)
         return value
 
     def visit_super_expr(self, expr):
-        distance = self.locals[expr]
-        superclass = self.environment.get_at(distance, "super")
-        object = self.environment.get_at(distance - 1, "this")
+        method, object = self.find_super_method(expr)
+        return object.bind(method)
+
+    def find_super_method(self, expr):
+        superclass = self.environment.get_at(expr.depth, expr.slot)
+        # 'this' is the first slot of the method frame just inside 'super'.
+        object = self.environment.get_at(expr.depth - 1, 0)
 
         method = superclass.find_method(expr.method.lexem)
         if method is None:
             raise RuntimeException(expr.method, f"Undefined property {expr.method.lexem}.")
 
-        return method.bind(object)
+        return method, object
 
     def visit_this_expr(self, expr):
         return self.look_up_variable(expr.keyword, expr)
@@ -200,9 +363,12 @@ class Interpreter(ExprVisitor, StmtVisitor):
         return self.look_up_variable(expr.name, expr)
 
     def look_up_variable(self, name, expr):
-        if self.locals.keys().__contains__(expr):
-            distance = self.locals[expr]
-            return self.environment.get_at(distance, name.lexem)
+        if expr.depth is not None:
+            value = self.environment.get_at(expr.depth, expr.slot)
+            if type(value) is Rope:
+                value = ''.join(value.pieces)
+                self.environment.assign_at(expr.depth, expr.slot, value)
+            return value
         else:
             return self.globals.get(name)
 
@@ -224,10 +390,7 @@ class Interpreter(ExprVisitor, StmtVisitor):
         return expr.accept(self)
 
     def execute(self, stmt):
-        stmt.accept(self)
-
-    def resolve(self, expr, depth):
-        self.locals[expr] = depth
+        return stmt.accept(self)
 
     def execute_block(self, statements, environment):
         previous = self.environment
@@ -236,12 +399,39 @@ class Interpreter(ExprVisitor, StmtVisitor):
             self.environment = environment
 
             for statement in statements:
-                self.execute(statement)
+                if statement.accept(self):
+                    return True
         finally:
             self.environment = previous
 
+    def execute_call(self, function, environment, default=None):
+        # Runs the body of a Lox function, returning default if it ends
+        # without a 'return'. Every call of a LoxFunction comes through here.
+        if self.call_depth >= MAX_CALL_DEPTH:
+            raise RuntimeException(function.declaration.name, "Stack overflow.")
+
+        self.call_depth += 1
+        try:
+            while self.execute_block(function.declaration.body, environment):
+                if self.tail_call is None:
+                    return self.return_value
+                function, environment = self.tail_call
+                self.tail_call = None
+                default = None
+            return default
+        except RecursionError:
+            # Deeply nested expressions can use up Python's stack first.
+            raise RuntimeException(function.declaration.name, "Stack overflow.")
+        finally:
+            self.call_depth -= 1
+
     def visit_block_stmt(self, stmt):
-        self.execute_block(stmt.statements, Environment(self.environment))
+        if stmt.has_scope:
+            return self.execute_block(stmt.statements, Environment(self.environment))
+
+        for statement in stmt.statements:
+            if statement.accept(self):
+                return True
         return None
 
     def visit_class_stmt(self, stmt):
@@ -251,24 +441,21 @@ class Interpreter(ExprVisitor, StmtVisitor):
             if not type(superclass) == LoxClass:
                 raise RuntimeException(stmt.superclass.name, "Superclass must be a class.")
 
-        self.environment.define(stmt.name.lexem, None)
-
+        method_environment = self.environment
         if stmt.superclass is not None:
-            self.environment = Environment(self.environment)
-            self.environment.define("super", superclass)
+            method_environment = Environment(self.environment, [superclass])
 
         methods = {}
 
         for method in stmt.methods:
-            function = LoxFunction(method, self.environment, method.name.lexem == "init")
+            function = LoxFunction(method, method_environment, method.name.lexem == "init")
             methods[method.name.lexem] = function
 
         klass = LoxClass(stmt.name.lexem, superclass, methods)
 
-        if stmt.superclass is not None:
-            self.environment = self.environment.enclosing
-
-        self.environment.assign(stmt.name, klass)
+        # Nothing can read the class's own slot before this point, so it is
+        # defined once the class exists rather than defined and reassigned.
+        self.environment.define(stmt.name.lexem, klass)
         return None
 
     @staticmethod
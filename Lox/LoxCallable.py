@@ -3,6 +3,8 @@ from time import time
 
 
 class LoxCallable(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def arity(self):
         pass
@@ -28,6 +30,8 @@ class Read(LoxCallable):
         return 1
 
     def call(self, interpreter, arguments):
+        # The prompt has to appear after everything printed so far.
+        interpreter.output.flush()
         return input(arguments[0])
 
     def __str__(self):
@@ -46,3 +50,16 @@ class Float(LoxCallable):
 
     def __str__(self):
         return "<native fn>"
+
+
+def define_natives(environment):
+    # Imported here because the collections are themselves LoxCallables.
+    from Lox.LoxCollections import List, Map, FloatArray, StringBuilder
+
+    environment.define("clock", Clock())
+    environment.define("read", Read())
+    environment.define("float", Float())
+    environment.define("List", List())
+    environment.define("Map", Map())
+    environment.define("FloatArray", FloatArray())
+    environment.define("StringBuilder", StringBuilder())
@@ -1,34 +1,43 @@
 from Lox.LoxCallable import LoxCallable
-from Lox.LoxInstance import LoxInstance
+from Lox.LoxInstance import LoxInstance, Shape
 
 
 class LoxClass(LoxCallable):
+    # The Stats whose instance and bound method counts include this class's,
+    # set by StatsInterpreter on the classes it creates.
+    allocations = None
+
     def __init__(self, name, superclass, methods):
         self.name = name
         self.superclass = superclass
         self.methods = methods
+        # Layout of an instance with no fields yet.
+        self.shape = Shape(self)
+
+        # Classes never change once created, so the inherited methods are
+        # flattened into one table up front instead of walking the
+        # superclass chain on every lookup.
+        self.method_table = {}
+        if superclass is not None:
+            self.method_table.update(superclass.method_table)
+        self.method_table.update(methods)
+
+        self.initializer = self.method_table.get("init")
+        self.initializer_arity = 0 if self.initializer is None else self.initializer.arity()
 
     def find_method(self, name):
-        if self.methods.keys().__contains__(name):
-            return self.methods[name]
-        elif self.superclass is not None:
-            return self.superclass.find_method(name)
-        else:
-            return None
+        return self.method_table.get(name)
 
     def __str__(self):
         return self.name
 
     def call(self, interpreter, arguments):
         instance = LoxInstance(self)
-        initializer = self.find_method("init")
-        if initializer is not None:
-            initializer.bind(instance).call(interpreter, arguments)
+        if self.allocations is not None:
+            self.allocations.instances += 1
+        if self.initializer is not None:
+            self.initializer.invoke(interpreter, instance, arguments)
         return instance
 
     def arity(self):
-        initializer = self.find_method("init")
-        if initializer is None:
-            return 0
-        else:
-            return initializer.arity()
+        return self.initializer_arity
@@ -0,0 +1,341 @@
+import itertools
+import math
+import operator
+from array import array
+from Lox.LoxCallable import LoxCallable
+from LoxErrors.RuntimeException import RuntimeException
+
+
+class NativeObject:
+    # A value implemented in Python whose properties are native methods.
+    # Engines fall back to get() for any object that is not a LoxInstance.
+    __slots__ = ()
+
+    # Dict<string, (arity, function)>, where function takes the receiver,
+    # the property's name token and then the call's arguments.
+    methods = {}
+
+    def get(self, name):
+        method = self.methods.get(name.lexem)
+        if method is None:
+            raise RuntimeException(name, f"Undefined property {name.lexem}.")
+        return NativeMethod(self, name, *method)
+
+
+class NativeMethod(LoxCallable):
+    # A native method fetched from a NativeObject. The name token it was
+    # fetched with is where its runtime errors are reported.
+    __slots__ = ('receiver', 'name', 'method_arity', 'function')
+
+    def __init__(self, receiver, name, arity, function):
+        self.receiver = receiver
+        self.name = name
+        self.method_arity = arity
+        self.function = function
+
+    def arity(self):
+        return self.method_arity
+
+    def call(self, interpreter, arguments):
+        return self.function(self.receiver, self.name, *arguments)
+
+    def __str__(self):
+        return "<native fn>"
+
+
+def stringify(value, printing=None):
+    # 'printing' holds the ids of the lists and maps whose contents are
+    # being printed, so one that contains itself prints as [...] or {...}.
+    if value is None:
+        return 'Nil'
+    if printing is not None and (type(value) is LoxList or type(value) is LoxMap):
+        return value.render(printing)
+    return value.__str__()
+
+
+def check_index(name, index, length, end=False):
+    # Lox numbers are floats; indexes must be whole numbers in range. A
+    # slice's end may also be the length itself.
+    if not (type(index) == float and index.is_integer()):
+        raise RuntimeException(name, "Index must be a whole number.")
+    if not 0 <= index < (length + 1 if end else length):
+        raise RuntimeException(name, "Index out of range.")
+    return int(index)
+
+
+class LoxList(NativeObject):
+    __slots__ = ('items',)
+
+    def __init__(self, items=None):
+        self.items = [] if items is None else items
+
+    def get_item(self, name, index):
+        return self.items[check_index(name, index, len(self.items))]
+
+    def set_item(self, name, index, value):
+        self.items[check_index(name, index, len(self.items))] = value
+        return value
+
+    def append(self, name, value):
+        self.items.append(value)
+        return None
+
+    def extend(self, name, other):
+        if not type(other) is LoxList:
+            raise RuntimeException(name, "Argument must be a list.")
+        self.items.extend(other.items)
+        return None
+
+    def pop(self, name):
+        if not self.items:
+            raise RuntimeException(name, "Cannot pop from an empty list.")
+        return self.items.pop()
+
+    def length(self, name):
+        return float(len(self.items))
+
+    def slice(self, name, start, end):
+        start = check_index(name, start, len(self.items), True)
+        end = check_index(name, end, len(self.items), True)
+        return LoxList(self.items[start:end])
+
+    methods = {
+        'get': (1, get_item),
+        'set': (2, set_item),
+        'append': (1, append),
+        'extend': (1, extend),
+        'pop': (0, pop),
+        'length': (0, length),
+        'slice': (2, slice),
+    }
+
+    def __str__(self):
+        return self.render(set())
+
+    def render(self, printing):
+        if id(self) in printing:
+            return '[...]'
+        printing.add(id(self))
+        text = '[' + ', '.join(stringify(item, printing) for item in self.items) + ']'
+        printing.remove(id(self))
+        return text
+
+
+class LoxMap(NativeObject):
+    __slots__ = ('entries',)
+
+    def __init__(self):
+        self.entries = {}
+
+    def get_entry(self, name, key):
+        return self.entries.get(key)
+
+    def set_entry(self, name, key, value):
+        self.entries[key] = value
+        return value
+
+    def has(self, name, key):
+        return key in self.entries
+
+    def remove(self, name, key):
+        return self.entries.pop(key, None)
+
+    def keys(self, name):
+        return LoxList(list(self.entries.keys()))
+
+    def values(self, name):
+        return LoxList(list(self.entries.values()))
+
+    def length(self, name):
+        return float(len(self.entries))
+
+    methods = {
+        'get': (1, get_entry),
+        'set': (2, set_entry),
+        'has': (1, has),
+        'remove': (1, remove),
+        'keys': (0, keys),
+        'values': (0, values),
+        'length': (0, length),
+    }
+
+    def __str__(self):
+        return self.render(set())
+
+    def render(self, printing):
+        if id(self) in printing:
+            return '{...}'
+        printing.add(id(self))
+        text = '{' + ', '.join(f'{stringify(key, printing)}: {stringify(value, printing)}'
+                               for key, value in self.entries.items()) + '}'
+        printing.remove(id(self))
+        return text
+
+
+# Operations FloatArray.map applies to every element, by name.
+FLOAT_OPERATIONS = {
+    'abs': abs,
+    'negate': operator.neg,
+    'sqrt': math.sqrt,
+    'floor': math.floor,
+    'ceil': math.ceil,
+    'exp': math.exp,
+    'log': math.log,
+    'sin': math.sin,
+    'cos': math.cos,
+}
+
+
+class LoxFloatArray(NativeObject):
+    # A fixed-length array of numbers stored unboxed in an array('d'). Its
+    # bulk methods loop in C rather than element by element in Lox.
+    __slots__ = ('values',)
+
+    def __init__(self, values):
+        self.values = values
+
+    def check_number(self, name, value):
+        if not type(value) == float:
+            raise RuntimeException(name, "FloatArray values must be numbers.")
+
+    def check_array(self, name, other):
+        if not type(other) is LoxFloatArray:
+            raise RuntimeException(name, "Argument must be a FloatArray.")
+        if not len(other.values) == len(self.values):
+            raise RuntimeException(name, "FloatArrays must have the same length.")
+
+    def get_item(self, name, index):
+        return self.values[check_index(name, index, len(self.values))]
+
+    def set_item(self, name, index, value):
+        index = check_index(name, index, len(self.values))
+        self.check_number(name, value)
+        self.values[index] = value
+        return value
+
+    def length(self, name):
+        return float(len(self.values))
+
+    def sum(self, name):
+        return float(sum(self.values))
+
+    def fill(self, name, value):
+        self.check_number(name, value)
+        self.values = array('d', [value]) * len(self.values)
+        return None
+
+    def scale(self, name, factor):
+        self.check_number(name, factor)
+        self.values = array('d', map(operator.mul, self.values, itertools.repeat(factor)))
+        return None
+
+    def map(self, name, operation):
+        function = FLOAT_OPERATIONS.get(operation) if type(operation) == str else None
+        if function is None:
+            raise RuntimeException(name, f"Unknown operation {stringify(operation)}.")
+        try:
+            self.values = array('d', map(function, self.values))
+        except (ValueError, OverflowError):
+            raise RuntimeException(name, f"Operation {operation} is undefined for an element.")
+        return None
+
+    def dot(self, name, other):
+        self.check_array(name, other)
+        return float(sum(map(operator.mul, self.values, other.values)))
+
+    methods = {
+        'get': (1, get_item),
+        'set': (2, set_item),
+        'length': (0, length),
+        'sum': (0, sum),
+        'fill': (1, fill),
+        'scale': (1, scale),
+        'map': (1, map),
+        'dot': (1, dot),
+    }
+
+    def __str__(self):
+        return '[' + ', '.join(str(value) for value in self.values) + ']'
+
+
+class LoxStringBuilder(NativeObject):
+    # Collects pieces of a string and joins them once, when it is read.
+    __slots__ = ('pieces', 'size')
+
+    def __init__(self):
+        self.pieces = []
+        self.size = 0
+
+    def append(self, name, value):
+        piece = stringify(value)
+        self.pieces.append(piece)
+        self.size += len(piece)
+        return None
+
+    def to_string(self, name):
+        if len(self.pieces) > 1:
+            self.pieces = [''.join(self.pieces)]
+        return self.pieces[0] if self.pieces else ''
+
+    def length(self, name):
+        return float(self.size)
+
+    methods = {
+        'append': (1, append),
+        'toString': (0, to_string),
+        'length': (0, length),
+    }
+
+    def __str__(self):
+        return self.to_string(None)
+
+
+class List(LoxCallable):
+    def arity(self):
+        return 0
+
+    def call(self, interpreter, arguments):
+        return LoxList()
+
+    def __str__(self):
+        return "<native fn>"
+
+
+class Map(LoxCallable):
+    def arity(self):
+        return 0
+
+    def call(self, interpreter, arguments):
+        return LoxMap()
+
+    def __str__(self):
+        return "<native fn>"
+
+
+class StringBuilder(LoxCallable):
+    def arity(self):
+        return 0
+
+    def call(self, interpreter, arguments):
+        return LoxStringBuilder()
+
+    def __str__(self):
+        return "<native fn>"
+
+
+class FloatArray(LoxCallable):
+    # FloatArray(n) makes an array of n zeros, and FloatArray(list) one
+    # holding the numbers in a List. Anything else gives nil, as float() does.
+    def arity(self):
+        return 1
+
+    def call(self, interpreter, arguments):
+        source = arguments[0]
+        if type(source) == float and source.is_integer() and source >= 0:
+            return LoxFloatArray(array('d', bytes(8 * int(source))))
+        if type(source) is LoxList and all(type(item) == float for item in source.items):
+            return LoxFloatArray(array('d', source.items))
+        return None
+
+    def __str__(self):
+        return "<native fn>"
@@ -1,37 +1,53 @@
 from Lox.LoxCallable import LoxCallable
 from Lox import Enviorment
-from LoxErrors.ReturnException import Return
+
+
+# Deepest chain of Lox calls before a "Stack overflow." runtime error. The
+# tree-walking engines recurse in Python for every call and leave Python's
+# recursion limit alone, since past it the C stack can overflow and crash the
+# process; they report the RecursionError that usually comes first the same
+# way.
+MAX_CALL_DEPTH = 10000
 
 
 class LoxFunction(LoxCallable):
+    __slots__ = ('declaration', 'closure', 'isInit')
+
     def __init__(self, declaration, closure, is_init):
         self.declaration = declaration
         self.closure = closure
         self.isInit = is_init
 
-    def bind(self, instance):
-        environment = Enviorment.Environment(self.closure)
-        environment.define("this", instance)
-        return LoxFunction(self.declaration, environment, self.isInit)
-
     def call(self, interpreter, arguments):
-        environment = Enviorment.Environment(self.closure)
+        # Parameters occupy the first slots of the call's scope, in order.
+        return interpreter.execute_call(self, Enviorment.Environment(self.closure, arguments))
+
+    def invoke(self, interpreter, instance, arguments):
+        # Methods find 'this' in the first slot of their own frame, ahead of
+        # the parameters, so calling one needs no bound-method object.
+        environment = Enviorment.Environment(self.closure, [instance, *arguments])
+        return interpreter.execute_call(self, environment, instance if self.isInit else None)
+
+    def arity(self):
+        return len(self.declaration.params)
 
-        for i in range(len(self.declaration.params)):
-            environment.define(self.declaration.params[i].lexem, arguments[i])
+    def __str__(self):
+        return f"<fn {self.declaration.name.lexem}>"
 
-        try:
-            interpreter.execute_block(self.declaration.body, environment)
-        except Return as return_value:
-            return return_value.value
 
-        if self.isInit:
-            return self.closure.get_at(0, "this")
+class LoxBoundMethod(LoxCallable):
+    # A method taken as a value, e.g. 'var f = object.method;'.
+    __slots__ = ('method', 'receiver')
 
-        return None
+    def __init__(self, method, receiver):
+        self.method = method
+        self.receiver = receiver
+
+    def call(self, interpreter, arguments):
+        return self.method.invoke(interpreter, self.receiver, arguments)
 
     def arity(self):
-        return len(self.declaration.params)
+        return self.method.arity()
 
     def __str__(self):
-        return f"<fn {self.declaration.name.lexem}>"
+        return self.method.__str__()
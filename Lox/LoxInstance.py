@@ -1,23 +1,97 @@
+from Lox.LoxFunction import LoxBoundMethod
 from LoxErrors.RuntimeException import RuntimeException
 
 
+class Shape:
+    # The field layout shared by every instance of a class that added the
+    # same fields in the same order. Adding a field moves an instance along a
+    # transition to the next shape, so equal layouts end up sharing one Shape.
+    __slots__ = ('klass', 'slots', 'transitions')
+
+    def __init__(self, klass, slots=None):
+        self.klass = klass
+        # Dict<string, int>, the field's index in LoxInstance.values
+        self.slots = {} if slots is None else slots
+        # Dict<string, Shape>
+        self.transitions = {}
+
+    def add_field(self, name):
+        shape = self.transitions.get(name)
+        if shape is None:
+            slots = dict(self.slots)
+            slots[name] = len(slots)
+            shape = Shape(self.klass, slots)
+            self.transitions[name] = shape
+        return shape
+
+
 class LoxInstance:
+    __slots__ = ('klass', 'shape', 'values', 'bound_methods')
+
     def __init__(self, klass):
         self.klass = klass
-        self.fields = {}
+        self.shape = klass.shape
+        self.values = []
+        # Dict<LoxFunction, LoxBoundMethod>, created when a method first
+        # escapes as a value so that fetching it again reuses the object.
+        self.bound_methods = None
+
+    def bind(self, method):
+        if self.bound_methods is None:
+            self.bound_methods = {}
+
+        bound = self.bound_methods.get(method)
+        if bound is None:
+            bound = LoxBoundMethod(method, self)
+            self.bound_methods[method] = bound
+            if self.klass.allocations is not None:
+                self.klass.allocations.bound_methods += 1
+        return bound
+
+    # Get and Set nodes carry a monomorphic inline cache keyed on the shape
+    # of the last instance seen there. Engines check the cache themselves
+    # and only fall back to these methods on a miss, which refill it.
+
+    def fill_cache(self, site):
+        name = site.name.lexem
+        shape = self.shape
+
+        slot = shape.slots.get(name)
+        if slot is not None:
+            site.cache_shape = shape
+            site.cache_field = slot
+            site.cache_method = None
+            return
+
+        method = self.klass.find_method(name)
+        if method is None:
+            raise RuntimeException(site.name, f"Undefined property {name}.")
 
-    def get(self, name):
-        if self.fields.keys().__contains__(name.lexem):
-            return self.fields[name.lexem]
+        site.cache_shape = shape
+        site.cache_field = None
+        site.cache_method = method
 
-        method = self.klass.find_method(name.lexem)
-        if method is not None:
-            return method.bind(self)
+    def get_cached(self, site):
+        self.fill_cache(site)
+        if site.cache_method is None:
+            return self.values[site.cache_field]
+        return self.bind(site.cache_method)
 
-        raise RuntimeException(name, f"Undefined property {name.lexem}.")
+    def set_cached(self, site, value):
+        name = site.name.lexem
+        shape = self.shape
 
-    def set(self, name, value):
-        self.fields[name.lexem] = value
+        site.cache_shape = shape
+        slot = shape.slots.get(name)
+        if slot is None:
+            self.shape = shape.add_field(name)
+            self.values.append(value)
+            site.cache_field = len(shape.slots)
+            site.cache_transition = self.shape
+        else:
+            self.values[slot] = value
+            site.cache_field = slot
+            site.cache_transition = None
 
     def __str__(self):
         return self.klass.name + " <instance>"
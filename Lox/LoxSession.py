@@ -0,0 +1,82 @@
+from Lox.Parser import Parser
+from Lox.Resolver import Resolver
+from Lox.Optimizer import Optimizer
+from Lox.Interpreter import Interpreter
+from Lox.VM import VM
+from Lox.ClosureCompiler import ClosureInterpreter
+from Lox.Scanner import Scanner
+from Lox.FastScanner import FastScanner
+from Lox.Output import Output, DEFAULT_BUFFER_SIZE
+from LoxErrors.Error import Error, global_errors
+
+
+ENGINES = {
+    'interpreter': Interpreter,
+    'vm': VM,
+    'closure': ClosureInterpreter,
+}
+
+SCANNERS = {
+    'fast': FastScanner,
+    'classic': Scanner,
+}
+
+
+def load_program(source, scanner_class=FastScanner, optimize=True, errors=global_errors):
+    # Scans, parses and resolves source, reporting any errors to errors.
+    # Returns the statements to run, or None if there were errors.
+    scanner = scanner_class(source, errors)
+    tokens = scanner.scan_tokens()
+
+    parser = Parser(tokens, errors)
+    statements = parser.parse()
+
+    # The parser reports every declaration it gives up on, so the flags
+    # alone say whether the program is whole. It may also be empty.
+    if errors.had_error or errors.had_runtime_error:
+        return None
+    else:
+        resolver = Resolver(errors)
+        resolver.resolve(statements)
+
+        if errors.had_error or errors.had_runtime_error:
+            return None
+
+        if optimize:
+            statements = Optimizer().optimize(statements)
+
+        return statements
+
+
+class LoxSession:
+    # Runs Lox programs for a host application. Each session has its own
+    # engine, globals, error state and output, so sessions can run in
+    # separate threads without seeing each other's variables or errors.
+    #
+    # Printed output and error messages go to stream, or without one to
+    # whatever sys.stdout is at the time they are written.
+    def __init__(self, stream=None, engine='interpreter', scanner='fast', optimize=True,
+                 buffer_size=DEFAULT_BUFFER_SIZE):
+        self.output = Output(stream, buffer_size)
+        self.errors = Error(stream, self.output)
+        self.interpreter = ENGINES[engine](self.output, self.errors)
+        self.scanner_class = SCANNERS[scanner]
+        self.optimize = optimize
+
+    def load(self, source):
+        return load_program(source, self.scanner_class, self.optimize, self.errors)
+
+    def run(self, source):
+        # Runs source with the globals left by earlier runs, like a line of
+        # the repl, and returns the exit code LoxBase would: 65 after a
+        # compile error, 70 after a runtime error and otherwise 0.
+        self.errors.reset()
+        statements = self.load(source)
+        if statements is not None:
+            self.interpreter.interpret(statements)
+
+        if self.errors.had_error:
+            return 65
+        elif self.errors.had_runtime_error:
+            return 70
+        return 0
@@ -0,0 +1,69 @@
+# Opcodes for the bytecode VM. These are plain ints rather than an Enum so
+# the dispatch loop in VM.run only compares small integers.
+#
+# Operands follow the opcode in the code array. Operands named "const" are
+# indexes into the chunk's constant pool; tokens are kept there so runtime
+# errors report the same line as the tree-walking interpreter.
+
+CONSTANT = 0        # const
+NIL = 1
+TRUE = 2
+FALSE = 3
+POP = 4
+
+GET_LOCAL = 5       # depth, slot
+SET_LOCAL = 6       # depth, slot
+GET_GLOBAL = 7      # const token
+SET_GLOBAL = 8      # const token
+DEFINE = 9          # const name
+
+GET_PROPERTY = 10   # const Get node, which holds the inline cache
+CHECK_FIELDS = 11   # const token
+SET_PROPERTY = 12   # const Set node, which holds the inline cache
+GET_SUPER = 13      # depth, slot, const token
+
+EQUAL = 14
+NOT_EQUAL = 15
+GREATER = 16        # const token
+GREATER_EQUAL = 17  # const token
+LESS = 18           # const token
+LESS_EQUAL = 19     # const token
+ADD = 20            # const token
+SUBTRACT = 21       # const token
+MULTIPLY = 22       # const token
+DIVIDE = 23         # const token
+MODULO = 24         # const token
+NOT = 25
+NEGATE = 26         # const token
+
+PRINT = 27
+JUMP = 28           # target
+JUMP_IF_FALSE = 29  # target
+AND_JUMP = 30       # target
+OR_JUMP = 31        # target
+
+CALL = 32           # argument count, const token
+CLOSURE = 33        # const FunctionProto
+CLASS = 34          # const ClassProto
+RETURN = 35
+PUSH_ENV = 36
+POP_ENV = 37
+
+# Method calls push the method and its receiver instead of a bound method.
+# A field holding a callable is pushed with a nil receiver, and INVOKE then
+# behaves like CALL.
+GET_METHOD = 38        # const Get node
+GET_SUPER_METHOD = 39  # depth, slot, const token
+INVOKE = 40            # argument count, const token
+
+# Number of operands following each opcode, used by Chunk.disassemble.
+OPERANDS = {
+    CONSTANT: 1, GET_LOCAL: 2, SET_LOCAL: 2, GET_GLOBAL: 1, SET_GLOBAL: 1, DEFINE: 1,
+    GET_PROPERTY: 1, CHECK_FIELDS: 1, SET_PROPERTY: 1, GET_SUPER: 3,
+    GREATER: 1, GREATER_EQUAL: 1, LESS: 1, LESS_EQUAL: 1,
+    ADD: 1, SUBTRACT: 1, MULTIPLY: 1, DIVIDE: 1, MODULO: 1, NEGATE: 1,
+    JUMP: 1, JUMP_IF_FALSE: 1, AND_JUMP: 1, OR_JUMP: 1,
+    CALL: 2, CLOSURE: 1, CLASS: 1, GET_METHOD: 1, GET_SUPER_METHOD: 3, INVOKE: 2,
+}
+
+NAMES = {value: name for name, value in list(globals().items()) if type(value) is int}
@@ -0,0 +1,156 @@
+from Lox.Stmt import StmtVisitor, Block
+from Lox.SyntaxTree import ExprVisitor, Literal
+from Lox.TokenType import TokenType
+from Lox.Interpreter import Interpreter
+from LoxErrors.RuntimeException import RuntimeException
+
+
+class Optimizer(StmtVisitor, ExprVisitor):
+    # Runs after the Resolver. Each visit returns the node to use in place
+    # of the one visited, or None for a statement that can be dropped.
+    #
+    # Operations on literals are folded by evaluating them with the
+    # interpreter, so a folded result is exactly what running it would give.
+    # Anything that would fail at runtime, such as '1 + nil' or a division
+    # by zero, is left in place to fail when it runs.
+    def __init__(self):
+        self.evaluator = Interpreter()
+
+    def optimize(self, statements):
+        return self.statements(statements)
+
+    def statements(self, statements):
+        optimized = []
+        for statement in statements:
+            if statement is not None:
+                statement = statement.accept(self)
+                if statement is not None:
+                    optimized.append(statement)
+        return optimized
+
+    def fold(self, expr):
+        try:
+            return Literal(expr.accept(self.evaluator))
+        except (RuntimeException, ArithmeticError):
+            return expr
+
+    def visit_expression_stmt(self, stmt):
+        stmt.expression = stmt.expression.accept(self)
+        if type(stmt.expression) is Literal:
+            return None
+        return stmt
+
+    def visit_print_stmt(self, stmt):
+        stmt.expression = stmt.expression.accept(self)
+        return stmt
+
+    def visit_var_stmt(self, stmt):
+        if stmt.initializer is not None:
+            stmt.initializer = stmt.initializer.accept(self)
+        return stmt
+
+    def visit_block_stmt(self, stmt):
+        stmt.statements = self.statements(stmt.statements)
+        return stmt
+
+    def visit_if_stmt(self, stmt):
+        stmt.condition = stmt.condition.accept(self)
+        # Branches are statements rather than declarations, so dropping one
+        # never removes a variable from the enclosing scope.
+        if type(stmt.condition) is Literal:
+            if Interpreter.is_truthy(stmt.condition.value):
+                return stmt.then_branch.accept(self)
+            elif stmt.else_branch is not None:
+                return stmt.else_branch.accept(self)
+            return None
+
+        stmt.then_branch = self.branch(stmt.then_branch)
+        if stmt.else_branch is not None:
+            stmt.else_branch = stmt.else_branch.accept(self)
+        return stmt
+
+    def branch(self, stmt):
+        # A branch or loop body that optimizes away still needs a statement.
+        stmt = stmt.accept(self)
+        if stmt is None:
+            return Block([], False)
+        return stmt
+
+    def visit_while_stmt(self, stmt):
+        stmt.condition = stmt.condition.accept(self)
+        if type(stmt.condition) is Literal and not Interpreter.is_truthy(stmt.condition.value):
+            return None
+
+        stmt.body = self.branch(stmt.body)
+        return stmt
+
+    def visit_function_stmt(self, stmt):
+        stmt.body = self.statements(stmt.body)
+        return stmt
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is not None:
+            stmt.value = stmt.value.accept(self)
+        return stmt
+
+    def visit_class_stmt(self, stmt):
+        for method in stmt.methods:
+            method.accept(self)
+        return stmt
+
+    def visit_assign_expr(self, expr):
+        expr.value = expr.value.accept(self)
+        return expr
+
+    def visit_binary_expr(self, expr):
+        expr.left = expr.left.accept(self)
+        expr.right = expr.right.accept(self)
+        if type(expr.left) is Literal and type(expr.right) is Literal:
+            return self.fold(expr)
+        return expr
+
+    def visit_call_expr(self, expr):
+        expr.callee = expr.callee.accept(self)
+        expr.arguments = [argument.accept(self) for argument in expr.arguments]
+        return expr
+
+    def visit_get_expr(self, expr):
+        expr.object = expr.object.accept(self)
+        return expr
+
+    def visit_grouping_expr(self, expr):
+        return expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr):
+        return expr
+
+    def visit_logic_expr(self, expr):
+        expr.left = expr.left.accept(self)
+        expr.right = expr.right.accept(self)
+        if type(expr.left) is Literal:
+            # 'or' yields a truthy left operand and 'and' a falsy one;
+            # otherwise the result is the right operand.
+            if Interpreter.is_truthy(expr.left.value) == (expr.operator.type == TokenType.OR):
+                return expr.left
+            return expr.right
+        return expr
+
+    def visit_set_expr(self, expr):
+        expr.object = expr.object.accept(self)
+        expr.value = expr.value.accept(self)
+        return expr
+
+    def visit_super_expr(self, expr):
+        return expr
+
+    def visit_this_expr(self, expr):
+        return expr
+
+    def visit_unary_expr(self, expr):
+        expr.right = expr.right.accept(self)
+        if type(expr.right) is Literal:
+            return self.fold(expr)
+        return expr
+
+    def visit_variable_expr(self, expr):
+        return expr
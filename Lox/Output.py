@@ -0,0 +1,36 @@
+import sys
+
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class Output:
+    # Where 'print' writes. Lines are collected and written to the stream
+    # together once buffer_size characters have built up, or when flushed;
+    # with a buffer_size of 0 every line is written as it comes. Engines
+    # flush when they finish, unless told not to, or stop on a runtime
+    # error, and read() flushes before asking for input.
+    #
+    # Without a stream, lines go to whatever sys.stdout is at the time they
+    # are written.
+    def __init__(self, stream=None, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.lines = []
+        self.size = 0
+
+    def write_line(self, text):
+        self.lines.append(text)
+        self.size += len(text) + 1
+        if self.size > self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self.lines:
+            return
+        stream = sys.stdout if self.stream is None else self.stream
+        self.lines.append('')
+        stream.write('\n'.join(self.lines))
+        self.lines = []
+        self.size = 0
+        stream.flush()
@@ -1,5 +1,5 @@
 from Lox import Stmt, SyntaxTree
-from LoxErrors.Error import Error
+from LoxErrors.Error import global_errors
 from Lox.TokenType import TokenType
 
 
@@ -8,22 +8,35 @@ class ParseError(Exception):
 
 
 class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
-        self.current = 0
+    def __init__(self, tokens, errors=None):
+        # Tokens are pulled one at a time and only the current and previous
+        # ones are kept, so 'tokens' may be a list or a lazy stream.
+        self.tokens = iter(tokens)
+        self.current_token = next(self.tokens)
+        self.previous_token = None
+        self.errors = global_errors if errors is None else errors
 
     def parse(self):
-        statements = []
-
         try:
-            while not self.is_at_end():
-                statements.append(self.declaration())
-
-            return statements
+            return list(self.declarations())
         except ParseError:
             print("Parse error")
             return None
 
+    def declarations(self):
+        # Yields each top-level declaration as soon as it has been parsed.
+        while not self.is_at_end():
+            try:
+                declaration = self.declaration()
+            except RecursionError:
+                # Nested deeper than Python's recursion limit allows. Caught
+                # here, at the top, so the enclosing blocks are not reported
+                # as unclosed one by one.
+                self.errors.error(self.peek(), "Too deeply nested.")
+                self.synchronize()
+                declaration = None
+            yield declaration
+
     def expression(self):
         return self.assignment()
 
@@ -359,21 +372,21 @@ class Parser:
 
     def advance(self):
         if not self.is_at_end():
-            self.current += 1
-        return self.previous()
+            self.previous_token = self.current_token
+            self.current_token = next(self.tokens)
+        return self.previous_token
 
     def is_at_end(self):
         return self.peek().type == TokenType.EOF
 
     def peek(self):
-        return self.tokens[self.current]
+        return self.current_token
 
     def previous(self):
-        return self.tokens[self.current - 1]
+        return self.previous_token
 
-    @staticmethod
-    def error(token, message):
-        Error.error(token, message)
+    def error(self, token, message):
+        self.errors.error(token, message)
         raise ParseError()
 
     def synchronize(self):
@@ -0,0 +1,138 @@
+import sys
+from time import perf_counter
+from Lox.Instrumentation import InstrumentedInterpreter
+
+
+SCRIPT = '<script>'
+
+
+def call_name(function):
+    declaration = function.declaration
+    return f'{declaration.name.lexem} (line {declaration.name.line})'
+
+
+class ProfilingInterpreter(InstrumentedInterpreter):
+    # The tree-walking interpreter, timing every Lox function call and
+    # statement as it runs them. Time is attributed to functions, by name and
+    # the line they are declared on, and to the line of each statement,
+    # counting only the time not spent in nested statements or calls.
+    #
+    # Calls are timed by wrapping Interpreter.execute_call, so Interpreter
+    # itself has no hooks and running without --profile costs nothing.
+    def __init__(self, output=None, errors=None):
+        super().__init__(output, errors)
+        # Dict<string, [calls, total seconds, self seconds]>
+        self.functions = {}
+        # Dict<int, [executions, self seconds]>
+        self.lines = {}
+        # Call stacks are numbered as they are first seen: stack_keys maps
+        # (caller's stack, function name) to a number, stack_entries holds
+        # that pair for each number and stack_times its self seconds.
+        self.stack_keys = {}
+        self.stack_entries = []
+        self.stack_times = []
+
+        # (function name, stack number) for each open call.
+        self.call_stack = []
+        # Dict<string, int>, how many calls of each function are open.
+        self.active = {}
+        # [start, seconds in nested calls] for each open call.
+        self.call_timers = []
+        # Seconds spent in nested statements, for each open statement.
+        self.statement_timers = [[0.0]]
+
+    def interpret(self, statements, flush=True):
+        self.enter(SCRIPT)
+        try:
+            super().interpret(statements, flush)
+        finally:
+            self.leave()
+
+    def enter(self, name):
+        key = (self.call_stack[-1][1] if self.call_stack else None, name)
+        stack = self.stack_keys.get(key)
+        if stack is None:
+            stack = self.stack_keys[key] = len(self.stack_entries)
+            self.stack_entries.append(key)
+            self.stack_times.append(0.0)
+
+        self.call_stack.append((name, stack))
+        self.active[name] = self.active.get(name, 0) + 1
+        self.call_timers.append([perf_counter(), 0.0])
+
+    def leave(self):
+        start, nested = self.call_timers.pop()
+        elapsed = perf_counter() - start
+        name, stack = self.call_stack.pop()
+        self.active[name] -= 1
+
+        record = self.functions.get(name)
+        if record is None:
+            record = self.functions[name] = [0, 0.0, 0.0]
+        record[0] += 1
+        # Recursive calls are already inside the outermost one's total.
+        if not self.active[name]:
+            record[1] += elapsed
+        record[2] += elapsed - nested
+        self.stack_times[stack] += elapsed - nested
+
+        if self.call_timers:
+            self.call_timers[-1][1] += elapsed
+
+    def execute_call(self, function, environment, default=None):
+        self.enter(call_name(function))
+        try:
+            return super().execute_call(function, environment, default)
+        finally:
+            self.leave()
+
+    def visit_return_stmt(self, stmt):
+        # A tail call runs in the caller's execute_call once this body has
+        # unwound, so the returning function's timing ends here and the
+        # callee's begins.
+        completed = super().visit_return_stmt(stmt)
+        if self.tail_call is not None:
+            self.leave()
+            self.enter(call_name(self.tail_call[0]))
+        return completed
+
+    def execute(self, stmt):
+        line = self.line(stmt)
+        nested = [0.0]
+        self.statement_timers.append(nested)
+        start = perf_counter()
+        try:
+            return stmt.accept(self)
+        finally:
+            elapsed = perf_counter() - start
+            self.statement_timers.pop()
+            self.statement_timers[-1][0] += elapsed
+
+            record = self.lines.get(line)
+            if record is None:
+                record = self.lines[line] = [0, 0.0]
+            record[0] += 1
+            record[1] += elapsed - nested[0]
+
+    def report(self, stream=sys.stderr, limit=20):
+        functions = sorted(self.functions.items(), key=lambda item: item[1][2], reverse=True)
+        stream.write(f'{"function":<40}{"calls":>10}{"total ms":>12}{"self ms":>12}\n')
+        for name, (calls, total, own) in functions[:limit]:
+            stream.write(f'{name:<40}{calls:>10}{total * 1000:>12.2f}{own * 1000:>12.2f}\n')
+
+        lines = sorted(self.lines.items(), key=lambda item: item[1][1], reverse=True)
+        stream.write(f'\n{"line":<40}{"runs":>10}{"":>12}{"self ms":>12}\n')
+        for line, (count, own) in lines[:limit]:
+            stream.write(f'{line:<40}{count:>10}{"":>12}{own * 1000:>12.2f}\n')
+
+    def write_collapsed_stacks(self, file):
+        # One 'caller;callee;... microseconds' line per distinct stack, the
+        # input flamegraph.pl and speedscope expect.
+        paths = []
+        for caller, name in self.stack_entries:
+            paths.append(name if caller is None else f'{paths[caller]};{name}')
+
+        for path, seconds in sorted(zip(paths, self.stack_times)):
+            microseconds = round(seconds * 1000000)
+            if microseconds > 0:
+                file.write(f'{path} {microseconds}\n')
@@ -0,0 +1,141 @@
+import hashlib
+import os
+import pickle
+import sys
+import time
+from Lox import Stmt, SyntaxTree
+from Lox.Scanner import Token
+from Lox.TokenType import TokenType
+
+
+CACHE_DIRECTORY = '__loxcache__'
+# Bump whenever the syntax tree classes, or what the resolver records on
+# them, change so that older entries stop matching.
+CACHE_VERSION = 3
+MAX_CACHE_SIZE = 64 * 1024 * 1024
+SUFFIX = '.pickle'
+TEMPORARY_SUFFIX = '.tmp'
+# Seconds after which a temporary file no store is still writing is taken to
+# have been left behind by a process that died.
+TEMPORARY_AGE = 60
+
+
+def syntax_classes():
+    # The only classes an entry may contain: syntax tree nodes, tokens and
+    # token types.
+    classes = [Token, TokenType]
+    for module, base in ((Stmt, Stmt.Stmt), (SyntaxTree, SyntaxTree.Expr)):
+        classes.extend(value for value in vars(module).values()
+                       if isinstance(value, type) and issubclass(value, base) and value is not base)
+    return {(cls.__module__, cls.__qualname__): cls for cls in classes}
+
+
+SYNTAX_CLASSES = syntax_classes()
+
+
+class ProgramUnpickler(pickle.Unpickler):
+    # Unpickling can call any function an entry names, so only the syntax
+    # tree classes are looked up. They are rebuilt by setting attributes,
+    # without running any of their code.
+    def find_class(self, module, name):
+        cls = SYNTAX_CLASSES.get((module, name))
+        if cls is None:
+            raise pickle.UnpicklingError(f'{module}.{name} is not part of a syntax tree')
+        return cls
+
+
+class ProgramCache:
+    # Keeps resolved programs in a __loxcache__ directory beside the script,
+    # one file per script named after a hash of its source, the cache
+    # version and the Python implementation. An entry from an older source
+    # of the same script is removed when a new one is stored, and the least
+    # recently used entries go once the directory grows past max_size bytes.
+    # Entries owned by anyone but the script's owner are ignored.
+    def __init__(self, script, max_size=MAX_CACHE_SIZE):
+        self.script = script
+        self.directory = os.path.join(os.path.dirname(os.path.abspath(script)), CACHE_DIRECTORY)
+        self.name = os.path.basename(script)
+        self.max_size = max_size
+
+    def path(self, source):
+        digest = hashlib.sha256()
+        digest.update(f'{CACHE_VERSION} {sys.implementation.cache_tag}\n'.encode())
+        digest.update(source.encode())
+        return os.path.join(self.directory, f'{self.name}.{digest.hexdigest()[:32]}{SUFFIX}')
+
+    def load(self, source):
+        path = self.path(source)
+        try:
+            with open(path, 'rb') as file:
+                if os.fstat(file.fileno()).st_uid != os.stat(self.script).st_uid:
+                    return None
+                statements = ProgramUnpickler(file).load()
+            os.utime(path)
+        except Exception:
+            # A damaged or unreadable entry is a miss; storing replaces it.
+            return None
+
+        return statements
+
+    def store(self, source, statements):
+        # Must run before the statements execute, while their inline caches
+        # are still empty.
+        path = self.path(source)
+        temporary = f'{path}.{os.getpid()}{TEMPORARY_SUFFIX}'
+        try:
+            data = pickle.dumps(statements, pickle.HIGHEST_PROTOCOL)
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temporary, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, path)
+        except (OSError, RecursionError, pickle.PicklingError):
+            return
+
+        self.remove_stale(path)
+        self.evict()
+
+    def entries(self, suffix=SUFFIX):
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+
+        return [os.path.join(self.directory, name) for name in names if name.endswith(suffix)]
+
+    def remove_stale(self, current):
+        for path in self.entries():
+            script = os.path.basename(path)[:-len(SUFFIX)].rsplit('.', 1)[0]
+            if script == self.name and not path == current:
+                remove(path)
+
+    def evict(self):
+        # Temporary files outlive a store only when its process died.
+        abandoned = time.time() - TEMPORARY_AGE
+        for path in self.entries(TEMPORARY_SUFFIX):
+            try:
+                if os.stat(path).st_mtime < abandoned:
+                    remove(path)
+            except OSError:
+                continue
+
+        entries = []
+        for path in self.entries():
+            try:
+                status = os.stat(path)
+            except OSError:
+                continue
+            entries.append((status.st_mtime, status.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            remove(path)
+            total -= size
+
+
+def remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -1,7 +1,7 @@
-from Lox.Stmt import StmtVisitor
+from Lox.Stmt import StmtVisitor, Var, Function as FunctionStmt, Class
 from Lox.SyntaxTree import ExprVisitor
 from enum import Enum
-from LoxErrors.Error import Error
+from LoxErrors.Error import global_errors
 from collections import deque
 
 
@@ -18,14 +18,34 @@ class ClassType(Enum):
     SUBCLASS = 3
 
 
+class Scope:
+    def __init__(self):
+        # Dict<string, bool>, whether the variable's initializer has run
+        self.defined = {}
+        # Dict<string, int>, the variable's slot in the runtime Environment
+        self.slots = {}
+
+    def add(self, name, defined):
+        if not self.slots.keys().__contains__(name):
+            self.slots[name] = len(self.slots)
+        self.defined[name] = defined
+
+
 class Resolver(StmtVisitor, ExprVisitor):
-    def __init__(self, interpreter):
-        self.interpreter = interpreter
+    def __init__(self, errors=None):
         self.scopes = deque()
         self.current_function = Function.none
         self.current_class = ClassType.NONE
+        self.errors = global_errors if errors is None else errors
 
     def visit_block_stmt(self, stmt):
+        # A block that declares nothing gets no scope of its own, so the
+        # variables it uses resolve one level shallower.
+        stmt.has_scope = any(isinstance(statement, (Var, FunctionStmt, Class)) for statement in stmt.statements)
+        if not stmt.has_scope:
+            self.resolve(stmt.statements)
+            return None
+
         self.begin_scope()
         self.resolve(stmt.statements)
         self.end_scope()
@@ -40,15 +60,12 @@ class Resolver(StmtVisitor, ExprVisitor):
 
         if stmt.superclass is not None:
             if stmt.name.lexem == stmt.superclass.name.lexem:
-                Error.error(stmt.superclass.name, "A class cannot inherit from itself.")
+                self.errors.error(stmt.superclass.name, "A class cannot inherit from itself.")
             else:
                 self.current_class = ClassType.SUBCLASS
                 self.resolve(stmt.superclass)
                 self.begin_scope()
-                self.scopes[-1]["super"] = True
-
-        self.begin_scope()
-        self.scopes[-1]["this"] = True
+                self.scopes[-1].add("super", True)
 
         for method in stmt.methods:
             declaration = Function.method
@@ -56,8 +73,6 @@ class Resolver(StmtVisitor, ExprVisitor):
                 declaration = Function.initializer
             self.resolve_function(method, declaration)
 
-        self.end_scope()
-
         if stmt.superclass is not None:
             self.end_scope()
 
@@ -83,11 +98,11 @@ class Resolver(StmtVisitor, ExprVisitor):
 
     def visit_return_stmt(self, stmt):
         if self.current_function == Function.none:
-            Error.error(stmt.keyword, "Cannot return from top-level code")
+            self.errors.error(stmt.keyword, "Cannot return from top-level code")
 
         if stmt.value is not None:
             if self.current_function == Function.initializer:
-                Error.error(stmt.keyword, "Cannot return from an initializer.")
+                self.errors.error(stmt.keyword, "Cannot return from an initializer.")
             self.resolve(stmt.value)
 
         return None
@@ -132,15 +147,15 @@ class Resolver(StmtVisitor, ExprVisitor):
 
     def visit_super_expr(self, expr):
         if self.current_class == ClassType.NONE:
-            Error.error(expr.keyword, "Cannot use 'super' outside of a class.")
+            self.errors.error(expr.keyword, "Cannot use 'super' outside of a class.")
         elif self.current_class != ClassType.SUBCLASS:
-            Error.error(expr.keyword, "Cannot use 'super' in a class without a super class.")
+            self.errors.error(expr.keyword, "Cannot use 'super' in a class without a super class.")
         self.resolve_local(expr, expr.keyword)
         return None
 
     def visit_this_expr(self, expr):
         if self.current_class == ClassType.NONE:
-            Error.error(expr.keyword, "Cannot use 'this' outside of a class.")
+            self.errors.error(expr.keyword, "Cannot use 'this' outside of a class.")
             return None
 
         self.resolve_local(expr, expr.keyword)
@@ -169,9 +184,9 @@ class Resolver(StmtVisitor, ExprVisitor):
         return None
 
     def visit_variable_expr(self, expr):
-        if not len(self.scopes) == 0 and self.scopes[-1].keys().__contains__(expr.name.lexem) and \
-                not self.scopes[-1][expr.name.lexem]:
-            Error.error(expr.name, "Cannot read local variable in its own initializer.")
+        if not len(self.scopes) == 0 and self.scopes[-1].defined.keys().__contains__(expr.name.lexem) and \
+                not self.scopes[-1].defined[expr.name.lexem]:
+            self.errors.error(expr.name, "Cannot read local variable in its own initializer.")
 
         self.resolve_local(expr, expr.name)
         return None
@@ -187,6 +202,9 @@ class Resolver(StmtVisitor, ExprVisitor):
         enclosing_function = self.current_function
         self.current_function = token_type
         self.begin_scope()
+        # Methods receive 'this' in the first slot of their own frame.
+        if token_type == Function.method or token_type == Function.initializer:
+            self.scopes[-1].add("this", True)
         for param in function.params:
             self.declare(param)
             self.define(param)
@@ -196,8 +214,7 @@ class Resolver(StmtVisitor, ExprVisitor):
         self.current_function = enclosing_function
 
     def begin_scope(self):
-        # Dict<string, bool>
-        self.scopes.append({})
+        self.scopes.append(Scope())
 
     def end_scope(self):
         self.scopes.pop()
@@ -207,20 +224,21 @@ class Resolver(StmtVisitor, ExprVisitor):
             return
 
         scope = self.scopes[-1]
-        if scope.keys().__contains__(name.lexem):
-            Error.error(name, "Variable with this name already declared in this scope.")
+        if scope.defined.keys().__contains__(name.lexem):
+            self.errors.error(name, "Variable with this name already declared in this scope.")
 
-        scope[name.lexem] = False
+        scope.add(name.lexem, False)
 
     def define(self, name):
         if len(self.scopes) == 0:
             return
 
         scope = self.scopes[-1]
-        scope[name.lexem] = True
+        scope.add(name.lexem, True)
 
     def resolve_local(self, expr, name):
         for i in range(len(self.scopes) - 1, -1, -1):
-            if self.scopes[i].keys().__contains__(name.lexem):
-                self.interpreter.resolve(expr, len(self.scopes) - 1 - i)
+            if self.scopes[i].slots.keys().__contains__(name.lexem):
+                expr.depth = len(self.scopes) - 1 - i
+                expr.slot = self.scopes[i].slots[name.lexem]
                 return
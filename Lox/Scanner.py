@@ -1,4 +1,4 @@
-from LoxErrors.Error import Error
+from LoxErrors.Error import global_errors
 from Lox.TokenType import TokenType
 
 
@@ -11,8 +11,9 @@ def keywords_init():
 
 
 class Scanner:
-    def __init__(self, source):
+    def __init__(self, source, errors=None):
         self.source = source
+        self.errors = global_errors if errors is None else errors
         self.tokens = []
         self.keywords = keywords_init()
         self.start = 0
@@ -77,7 +78,7 @@ class Scanner:
             elif c.isalpha() or c == '_':
                 self.identifier()
             else:
-                Error.error(self.line, "Unexpected character.")
+                self.errors.report(self.line, "", "Unexpected character.")
 
     def is_at_end(self):
         return self.current >= len(self.source)
@@ -111,7 +112,7 @@ class Scanner:
             self.advance()
 
         if self.is_at_end():
-            Error.error(self.line, "Unterminated string.")
+            self.errors.report(self.line, "", "Unterminated string.")
             return
 
         self.advance()
@@ -152,6 +153,8 @@ class Scanner:
 
 
 class Token:
+    __slots__ = ('type', 'lexem', 'literal', 'line')
+
     def __init__(self, token_type, lexem, literal, line):
         self.type = token_type
         self.lexem = lexem
@@ -0,0 +1,243 @@
+import copy
+import operator
+from Lox.Stmt import StmtVisitor, Stmt, Block, Expression
+from Lox.SyntaxTree import ExprVisitor, Expr, Assign, Binary, Literal, Variable
+from Lox.TokenType import TokenType
+
+
+# Fused nodes for shapes that are common in loops. Only the tree-walking
+# Interpreter runs them; each keeps the node it replaced and falls back to
+# it whenever the fast path does not apply, so errors and mixed-type
+# behaviour stay exactly as before.
+
+class IncrementLocal(Expr):
+    # 'x = x + c' or 'x = x - c' on a local x and a number c.
+    __slots__ = ('depth', 'slot', 'delta', 'fallback')
+
+    def __init__(self, depth, slot, delta, fallback):
+        self.depth = depth
+        self.slot = slot
+        self.delta = delta
+        self.fallback = fallback
+
+    def accept(self, visitor):
+        return visitor.visit_increment_local_expr(self)
+
+
+class CompareLocal(Expr):
+    # 'x < c', 'x <= c', 'x > c' or 'x >= c' on a local x and a number c.
+    __slots__ = ('depth', 'slot', 'compare', 'constant', 'fallback')
+
+    def __init__(self, depth, slot, compare, constant, fallback):
+        self.depth = depth
+        self.slot = slot
+        self.compare = compare
+        self.constant = constant
+        self.fallback = fallback
+
+    def accept(self, visitor):
+        return visitor.visit_compare_local_expr(self)
+
+
+class ForLoop(Stmt):
+    # The 'while (condition) { body; increment; }' a for loop desugars to.
+    # The block around body and increment declares nothing, so it has no
+    # scope and the loop runs both directly.
+    __slots__ = ('condition', 'body', 'increment')
+
+    def __init__(self, condition, body, increment):
+        self.condition = condition
+        self.body = body
+        self.increment = increment
+
+    def accept(self, visitor):
+        return visitor.visit_for_loop_stmt(self)
+
+
+class AppendLocal(Stmt):
+    # 'x = x + a + b ...;' as a statement on a local x. While x holds a
+    # string it is kept as a Rope, so building a string in a loop does not
+    # copy everything built so far on every pass. Pieces are (operator,
+    # expression) pairs in the order they are added.
+    __slots__ = ('depth', 'slot', 'pieces', 'fallback')
+
+    def __init__(self, depth, slot, pieces, fallback):
+        self.depth = depth
+        self.slot = slot
+        self.pieces = pieces
+        self.fallback = fallback
+
+    def accept(self, visitor):
+        return visitor.visit_append_local_stmt(self)
+
+
+class Rope:
+    # The value of a local that AppendLocal is building. Reading the
+    # variable joins the pieces and stores the string back in its place, so
+    # a Rope is never seen outside the Interpreter.
+    __slots__ = ('pieces',)
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+
+
+COMPARISONS = {
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+}
+
+
+def is_number(expr):
+    return type(expr) is Literal and type(expr.value) is float
+
+
+def is_local(expr):
+    return type(expr) is Variable and expr.depth is not None
+
+
+def rebuild(node, **children):
+    # Returns node with the given children, copying it first if any of them
+    # differ from the ones it has. Lists of children compare item by item.
+    for name, child in children.items():
+        if getattr(node, name) != child:
+            break
+    else:
+        return node
+
+    node = copy.copy(node)
+    for name, child in children.items():
+        setattr(node, name, child)
+    return node
+
+
+class Specializer(StmtVisitor, ExprVisitor):
+    # Rewrites a resolved program for the Interpreter, replacing the shapes
+    # above with their fused nodes. Each visit returns the node to use in
+    # place of the one visited. Nodes with a replaced child are copied
+    # rather than changed, so the program passed in is left as it was and
+    # can be specialized again or run on another engine.
+    def specialize(self, statements):
+        return [statement.accept(self) for statement in statements if statement is not None]
+
+    def visit_expression_stmt(self, stmt):
+        stmt = rebuild(stmt, expression=stmt.expression.accept(self))
+
+        expression = stmt.expression
+        if type(expression) is Assign and expression.depth is not None:
+            pieces = []
+            value = expression.value
+            while type(value) is Binary and value.operator.type == TokenType.PLUS:
+                pieces.append((value.operator, value.right))
+                value = value.left
+            if pieces and is_local(value) and value.depth == expression.depth and value.slot == expression.slot:
+                pieces.reverse()
+                return AppendLocal(expression.depth, expression.slot, pieces, stmt)
+
+        return stmt
+
+    def visit_print_stmt(self, stmt):
+        return rebuild(stmt, expression=stmt.expression.accept(self))
+
+    def visit_var_stmt(self, stmt):
+        if stmt.initializer is None:
+            return stmt
+        return rebuild(stmt, initializer=stmt.initializer.accept(self))
+
+    def visit_block_stmt(self, stmt):
+        return rebuild(stmt, statements=self.specialize(stmt.statements))
+
+    def visit_if_stmt(self, stmt):
+        else_branch = stmt.else_branch
+        if else_branch is not None:
+            else_branch = else_branch.accept(self)
+        return rebuild(stmt, condition=stmt.condition.accept(self), then_branch=stmt.then_branch.accept(self),
+                       else_branch=else_branch)
+
+    def visit_while_stmt(self, stmt):
+        stmt = rebuild(stmt, condition=stmt.condition.accept(self), body=stmt.body.accept(self))
+
+        body = stmt.body
+        if (type(body) is Block and not body.has_scope and len(body.statements) == 2
+                and type(body.statements[1]) is Expression):
+            return ForLoop(stmt.condition, body.statements[0], body.statements[1].expression)
+
+        return stmt
+
+    def visit_function_stmt(self, stmt):
+        return rebuild(stmt, body=self.specialize(stmt.body))
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is None:
+            return stmt
+        return rebuild(stmt, value=stmt.value.accept(self))
+
+    def visit_class_stmt(self, stmt):
+        return rebuild(stmt, methods=[method.accept(self) for method in stmt.methods])
+
+    # The fused nodes are already specialized.
+    def visit_for_loop_stmt(self, stmt):
+        return stmt
+
+    def visit_append_local_stmt(self, stmt):
+        return stmt
+
+    def visit_increment_local_expr(self, expr):
+        return expr
+
+    def visit_compare_local_expr(self, expr):
+        return expr
+
+    def visit_assign_expr(self, expr):
+        expr = rebuild(expr, value=expr.value.accept(self))
+
+        value = expr.value
+        if (expr.depth is not None and type(value) is Binary and is_number(value.right)
+                and is_local(value.left) and value.left.depth == expr.depth and value.left.slot == expr.slot):
+            if value.operator.type == TokenType.PLUS:
+                return IncrementLocal(expr.depth, expr.slot, value.right.value, expr)
+            elif value.operator.type == TokenType.MINUS:
+                return IncrementLocal(expr.depth, expr.slot, -value.right.value, expr)
+
+        return expr
+
+    def visit_binary_expr(self, expr):
+        expr = rebuild(expr, left=expr.left.accept(self), right=expr.right.accept(self))
+
+        if expr.operator.type in COMPARISONS and is_local(expr.left) and is_number(expr.right):
+            return CompareLocal(expr.left.depth, expr.left.slot, COMPARISONS[expr.operator.type],
+                                expr.right.value, expr)
+
+        return expr
+
+    def visit_call_expr(self, expr):
+        return rebuild(expr, callee=expr.callee.accept(self),
+                       arguments=[argument.accept(self) for argument in expr.arguments])
+
+    def visit_get_expr(self, expr):
+        return rebuild(expr, object=expr.object.accept(self))
+
+    def visit_grouping_expr(self, expr):
+        return rebuild(expr, expression=expr.expression.accept(self))
+
+    def visit_literal_expr(self, expr):
+        return expr
+
+    def visit_logic_expr(self, expr):
+        return rebuild(expr, left=expr.left.accept(self), right=expr.right.accept(self))
+
+    def visit_set_expr(self, expr):
+        return rebuild(expr, object=expr.object.accept(self), value=expr.value.accept(self))
+
+    def visit_super_expr(self, expr):
+        return expr
+
+    def visit_this_expr(self, expr):
+        return expr
+
+    def visit_unary_expr(self, expr):
+        return rebuild(expr, right=expr.right.accept(self))
+
+    def visit_variable_expr(self, expr):
+        return expr
@@ -0,0 +1,101 @@
+import sys
+from Lox.Instrumentation import InstrumentedInterpreter
+
+
+class Stats:
+    # Counts of what a program did while it ran.
+    def __init__(self):
+        # Dict<string, int>, executions of each kind of syntax tree node.
+        self.nodes = {}
+        # Dict<int, int>, node executions on each source line.
+        self.lines = {}
+        self.environments = 0
+        self.instances = 0
+        self.bound_methods = 0
+        self.returns = 0
+        self.tail_calls = 0
+
+    def as_dict(self):
+        return {
+            'nodes': dict(self.nodes),
+            'lines': dict(self.lines),
+            'environments': self.environments,
+            'instances': self.instances,
+            'bound_methods': self.bound_methods,
+            'returns': self.returns,
+            'tail_calls': self.tail_calls,
+        }
+
+    def report(self, stream=sys.stderr, limit=20):
+        stream.write(f'{"environments":<24}{self.environments:>12}\n')
+        stream.write(f'{"instances":<24}{self.instances:>12}\n')
+        stream.write(f'{"bound methods":<24}{self.bound_methods:>12}\n')
+        stream.write(f'{"returns":<24}{self.returns:>12}\n')
+        stream.write(f'{"tail calls":<24}{self.tail_calls:>12}\n')
+
+        stream.write(f'\n{"node":<24}{"executions":>12}\n')
+        for name, count in sorted(self.nodes.items(), key=lambda item: item[1], reverse=True):
+            stream.write(f'{name:<24}{count:>12}\n')
+
+        stream.write(f'\n{"line":<24}{"executions":>12}\n')
+        for line, count in sorted(self.lines.items(), key=lambda item: item[1], reverse=True)[:limit]:
+            stream.write(f'{line:<24}{count:>12}\n')
+
+
+class StatsInterpreter(InstrumentedInterpreter):
+    # The tree-walking interpreter, counting as it goes. The counts are in
+    # self.stats, and carry on adding up across calls to interpret().
+    #
+    # Environments are counted where this interpreter creates them, and
+    # instances and bound methods by the classes it creates, so other
+    # interpreters running at the same time are not counted.
+    def __init__(self, output=None, errors=None):
+        super().__init__(output, errors)
+        self.stats = Stats()
+
+    def count(self, node):
+        name = type(node).__name__
+        nodes = self.stats.nodes
+        nodes[name] = nodes.get(name, 0) + 1
+
+        line = self.line(node)
+        lines = self.stats.lines
+        lines[line] = lines.get(line, 0) + 1
+
+    def evaluate(self, expr):
+        self.count(expr)
+        return expr.accept(self)
+
+    def execute(self, stmt):
+        self.count(stmt)
+        return stmt.accept(self)
+
+    def execute_call(self, function, environment, default=None):
+        # Every call arrives with a new environment for its parameters.
+        self.stats.environments += 1
+        return super().execute_call(function, environment, default)
+
+    def visit_return_stmt(self, stmt):
+        self.stats.returns += 1
+        completed = super().visit_return_stmt(stmt)
+        if self.tail_call is not None:
+            self.stats.tail_calls += 1
+            self.stats.environments += 1
+        return completed
+
+    def visit_block_stmt(self, stmt):
+        if stmt.has_scope:
+            self.stats.environments += 1
+        return super().visit_block_stmt(stmt)
+
+    def visit_class_stmt(self, stmt):
+        super().visit_class_stmt(stmt)
+        if stmt.superclass is not None:
+            # The scope holding 'super' for the methods.
+            self.stats.environments += 1
+
+        # The class was just defined in the current scope.
+        values = self.environment.values
+        klass = values[stmt.name.lexem] if type(values) is dict else values[-1]
+        klass.allocations = self.stats
+        return None
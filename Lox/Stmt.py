@@ -40,12 +40,16 @@ class StmtVisitor(ABC):
 
 
 class Stmt(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def accept(self, expr):
         pass
 
 
 class Expression(Stmt):
+    __slots__ = ('expression',)
+
     def __init__(self, expression):
         self.expression = expression
 
@@ -54,6 +58,8 @@ class Expression(Stmt):
 
 
 class Function(Stmt):
+    __slots__ = ('name', 'params', 'body')
+
     def __init__(self, name, params, body):
         self.name = name
         self.params = params
@@ -64,6 +70,8 @@ class Function(Stmt):
 
 
 class If(Stmt):
+    __slots__ = ('condition', 'then_branch', 'else_branch')
+
     def __init__(self, condition, then_branch, else_branch):
         self.condition = condition
         self.then_branch = then_branch
@@ -74,6 +82,8 @@ class If(Stmt):
 
 
 class Print(Stmt):
+    __slots__ = ('expression',)
+
     def __init__(self, expression):
         self.expression = expression
 
@@ -82,6 +92,8 @@ class Print(Stmt):
 
 
 class Return(Stmt):
+    __slots__ = ('keyword', 'value')
+
     def __init__(self, keyword, value):
         self.keyword = keyword
         self.value = value
@@ -91,6 +103,8 @@ class Return(Stmt):
 
 
 class Var(Stmt):
+    __slots__ = ('name', 'initializer')
+
     def __init__(self, name, initializer):
         self.name = name
         self.initializer = initializer
@@ -100,6 +114,8 @@ class Var(Stmt):
 
 
 class While(Stmt):
+    __slots__ = ('condition', 'body')
+
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
@@ -109,14 +125,21 @@ class While(Stmt):
 
 
 class Block(Stmt):
-    def __init__(self, statements):
+    __slots__ = ('statements', 'has_scope')
+
+    def __init__(self, statements, has_scope=True):
         self.statements = statements
+        # Cleared by the Resolver when the block declares nothing, in which
+        # case it runs in the enclosing Environment.
+        self.has_scope = has_scope
 
     def accept(self, visitor):
         return visitor.visit_block_stmt(self)
 
 
 class Class(Stmt):
+    __slots__ = ('name', 'superclass', 'methods')
+
     def __init__(self, name, superclass, methods):
         self.name = name
         self.superclass = superclass
@@ -52,21 +52,30 @@ class ExprVisitor(ABC):
 
 
 class Expr(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def accept(self, expr):
         pass
 
 
 class Assign(Expr):
+    __slots__ = ('name', 'value', 'depth', 'slot')
+
     def __init__(self, name, value):
         self.name = name
         self.value = value
+        # Set by the Resolver for locals; globals keep depth None.
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor):
         return visitor.visit_assign_expr(self)
 
 
 class Binary(Expr):
+    __slots__ = ('left', 'operator', 'right')
+
     def __init__(self, left, operator, right):
         self.left = left
         self.operator = operator
@@ -77,6 +86,8 @@ class Binary(Expr):
 
 
 class Call(Expr):
+    __slots__ = ('callee', 'paren', 'arguments')
+
     def __init__(self, callee, paren, arguments):
         self.callee = callee
         self.paren = paren
@@ -87,15 +98,25 @@ class Call(Expr):
 
 
 class Get(Expr):
+    __slots__ = ('object', 'name', 'cache_shape', 'cache_field', 'cache_method')
+
     def __init__(self, object, name):
         self.object = object
         self.name = name
+        # Inline cache filled by LoxInstance.get_cached: for instances of
+        # cache_shape the property is either field cache_field or, when
+        # cache_method is set, that method.
+        self.cache_shape = None
+        self.cache_field = None
+        self.cache_method = None
 
     def accept(self, visitor):
         return visitor.visit_get_expr(self)
 
 
 class Grouping(Expr):
+    __slots__ = ('expression',)
+
     def __init__(self, expression):
         self.expression = expression
 
@@ -104,6 +125,8 @@ class Grouping(Expr):
 
 
 class Literal(Expr):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
@@ -112,6 +135,8 @@ class Literal(Expr):
 
 
 class Logic(Expr):
+    __slots__ = ('left', 'operator', 'right')
+
     def __init__(self, left, operator, right):
         self.left = left
         self.operator = operator
@@ -122,33 +147,51 @@ class Logic(Expr):
 
 
 class Set(Expr):
+    __slots__ = ('object', 'name', 'value', 'cache_shape', 'cache_field', 'cache_transition')
+
     def __init__(self, object, name, value):
         self.object = object
         self.name = name
         self.value = value
+        # Inline cache filled by LoxInstance.set_cached: instances of
+        # cache_shape store the value in field cache_field, first moving to
+        # cache_transition when the assignment adds that field.
+        self.cache_shape = None
+        self.cache_field = None
+        self.cache_transition = None
 
     def accept(self, visitor):
         return visitor.visit_set_expr(self)
 
 
 class Super(Expr):
+    __slots__ = ('keyword', 'method', 'depth', 'slot')
+
     def __init__(self, keyword, method):
         self.keyword = keyword
         self.method = method
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor):
         return visitor.visit_super_expr(self)
 
 
 class This(Expr):
+    __slots__ = ('keyword', 'depth', 'slot')
+
     def __init__(self, keyword):
         self.keyword = keyword
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor):
         return visitor.visit_this_expr(self)
 
 
 class Unary(Expr):
+    __slots__ = ('operator', 'right')
+
     def __init__(self, operator, right):
         self.operator = operator
         self.right = right
@@ -158,8 +201,12 @@ class Unary(Expr):
 
 
 class Variable(Expr):
+    __slots__ = ('name', 'depth', 'slot')
+
     def __init__(self, name):
         self.name = name
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor):
         return visitor.visit_variable_expr(self)
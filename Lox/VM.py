@@ -0,0 +1,379 @@
+from Lox.Compiler import Compiler
+from Lox.Interpreter import Interpreter
+from Lox.LoxFunction import LoxFunction, LoxBoundMethod, MAX_CALL_DEPTH
+from Lox.LoxInstance import LoxInstance
+from Lox.LoxCallable import LoxCallable, define_natives
+from Lox.LoxClass import LoxClass
+from Lox.LoxCollections import NativeObject
+from Lox.Enviorment import Environment, GlobalEnvironment
+from Lox.Output import Output
+from Lox.OpCode import (CONSTANT, NIL, TRUE, FALSE, POP, GET_LOCAL, SET_LOCAL, GET_GLOBAL, SET_GLOBAL, DEFINE,
+                        GET_PROPERTY, CHECK_FIELDS, SET_PROPERTY, GET_SUPER, EQUAL, NOT_EQUAL, GREATER,
+                        GREATER_EQUAL, LESS, LESS_EQUAL, ADD, SUBTRACT, MULTIPLY, DIVIDE, MODULO, NOT, NEGATE,
+                        PRINT, JUMP, JUMP_IF_FALSE, AND_JUMP, OR_JUMP, CALL, CLOSURE, CLASS, RETURN, PUSH_ENV,
+                        POP_ENV, GET_METHOD, GET_SUPER_METHOD, INVOKE)
+from LoxErrors.Error import global_errors
+from LoxErrors.RuntimeException import RuntimeException
+
+
+is_truthy = Interpreter.is_truthy
+is_equal = Interpreter.is_equal
+stringify = Interpreter.stringify
+
+
+class VMFunction(LoxFunction):
+    __slots__ = ('proto',)
+
+    def __init__(self, proto, closure, is_init):
+        super().__init__(proto.declaration, closure, is_init)
+        self.proto = proto
+
+    def call(self, interpreter, arguments):
+        return interpreter.run(self.proto.chunk, Environment(self.closure, arguments))
+
+    def invoke(self, interpreter, instance, arguments):
+        return interpreter.run(self.proto.chunk, Environment(self.closure, [instance, *arguments]))
+
+
+class VM:
+    def __init__(self, output=None, errors=None):
+        self.globals = GlobalEnvironment()
+        define_natives(self.globals)
+        self.output = Output() if output is None else output
+        self.errors = global_errors if errors is None else errors
+
+    def interpret(self, statements, flush=True):
+        chunk = Compiler().compile([statement for statement in statements if statement is not None])
+        try:
+            self.run(chunk, self.globals)
+        except RuntimeException as error:
+            self.output.flush()
+            self.errors.runtime_error(error)
+        finally:
+            if flush:
+                self.output.flush()
+
+    def run(self, chunk, environment):
+        # Calls between Lox functions push a frame here instead of recursing
+        # into run(); only natives re-enter it.
+        code = chunk.code
+        constants = chunk.constants
+        globals = self.globals
+        write_line = self.output.write_line
+        frames = []
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        ip = 0
+
+        while True:
+            op = code[ip]
+
+            if op == GET_LOCAL:
+                env = environment
+                depth = code[ip + 1]
+                while depth:
+                    env = env.enclosing
+                    depth -= 1
+                push(env.values[code[ip + 2]])
+                ip += 3
+            elif op == CONSTANT:
+                push(constants[code[ip + 1]])
+                ip += 2
+            elif op == GET_GLOBAL:
+                name = constants[code[ip + 1]]
+                try:
+                    push(globals.values[name.lexem])
+                except KeyError:
+                    push(globals.get(name))
+                ip += 2
+            elif op == JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False:
+                    ip = code[ip + 1]
+                else:
+                    ip += 2
+            elif op == JUMP:
+                ip = code[ip + 1]
+            elif op == POP:
+                pop()
+                ip += 1
+            elif op == ADD:
+                right = pop()
+                left = stack[-1]
+                if type(left) == float and type(right) == float:
+                    stack[-1] = left + right
+                elif (type(left) == str or type(left) == float) and (type(right) == str or type(right) == float):
+                    stack[-1] = str(left) + str(right)
+                else:
+                    raise RuntimeException(constants[code[ip + 1]], "Operators must be two numbers or strings.")
+                ip += 2
+            elif op == SUBTRACT:
+                right = pop()
+                left = stack[-1]
+                if not (type(left) == float and type(right) == float):
+                    raise RuntimeException(constants[code[ip + 1]], "Operands must be a number.")
+                stack[-1] = left - right
+                ip += 2
+            elif op == LESS:
+                right = pop()
+                left = stack[-1]
+                if not (type(left) == float and type(right) == float):
+                    raise RuntimeException(constants[code[ip + 1]], "Operands must be a number.")
+                stack[-1] = left < right
+                ip += 2
+            elif op == SET_LOCAL:
+                env = environment
+                depth = code[ip + 1]
+                while depth:
+                    env = env.enclosing
+                    depth -= 1
+                env.values[code[ip + 2]] = stack[-1]
+                ip += 3
+            elif op == CALL or op == INVOKE:
+                count = code[ip + 1]
+                if count:
+                    arguments = stack[-count:]
+                    del stack[-count:]
+                else:
+                    arguments = []
+                receiver = pop() if op == INVOKE else None
+                callee = pop()
+
+                if type(callee) is LoxBoundMethod:
+                    receiver = callee.receiver
+                    callee = callee.method
+
+                if not isinstance(callee, LoxCallable):
+                    raise RuntimeException(constants[code[ip + 2]], "Can only call functions and classes.")
+
+                if not count == callee.arity():
+                    raise RuntimeException(constants[code[ip + 2]],
+                                           f"Expected {callee.arity()} arguments but got {count}.")
+
+                # Constructors run their initializer in a frame of this loop
+                # too; returning from it yields the new instance.
+                constructed = None
+                if type(callee) is LoxClass and type(callee.initializer) is VMFunction:
+                    constructed = receiver = LoxInstance(callee)
+                    callee = callee.initializer
+
+                if type(callee) is VMFunction:
+                    # A call followed by RETURN is a tail call: the callee
+                    # takes over the current frame and returns to its caller.
+                    if constructed is not None or not code[ip + 3] == RETURN:
+                        if len(frames) >= MAX_CALL_DEPTH:
+                            raise RuntimeException(callee.declaration.name, "Stack overflow.")
+                        frames.append((code, constants, ip + 3, environment, constructed))
+                    if receiver is not None:
+                        arguments.insert(0, receiver)
+                    environment = Environment(callee.closure, arguments)
+                    chunk = callee.proto.chunk
+                    code = chunk.code
+                    constants = chunk.constants
+                    ip = 0
+                else:
+                    push(callee.call(self, arguments))
+                    ip += 3
+            elif op == RETURN:
+                if not frames:
+                    return pop()
+                code, constants, ip, environment, constructed = frames.pop()
+                if constructed is not None:
+                    stack[-1] = constructed
+            elif op == GET_PROPERTY:
+                object = stack[-1]
+                site = constants[code[ip + 1]]
+                if type(object) is LoxInstance:
+                    if object.shape is site.cache_shape:
+                        if site.cache_method is None:
+                            stack[-1] = object.values[site.cache_field]
+                        else:
+                            stack[-1] = object.bind(site.cache_method)
+                    else:
+                        stack[-1] = object.get_cached(site)
+                elif isinstance(object, NativeObject):
+                    stack[-1] = object.get(site.name)
+                else:
+                    raise RuntimeException(site.name, "Only instances have properties.")
+                ip += 2
+            elif op == CHECK_FIELDS:
+                if not type(stack[-1]) is LoxInstance:
+                    raise RuntimeException(constants[code[ip + 1]], "Only instances have fields.")
+                ip += 2
+            elif op == SET_PROPERTY:
+                value = pop()
+                object = stack[-1]
+                site = constants[code[ip + 1]]
+                if object.shape is site.cache_shape:
+                    if site.cache_transition is None:
+                        object.values[site.cache_field] = value
+                    else:
+                        object.shape = site.cache_transition
+                        object.values.append(value)
+                else:
+                    object.set_cached(site, value)
+                stack[-1] = value
+                ip += 2
+            elif op == PUSH_ENV:
+                environment = Environment(environment)
+                ip += 1
+            elif op == POP_ENV:
+                environment = environment.enclosing
+                ip += 1
+            elif op == MULTIPLY:
+                right = pop()
+                left = stack[-1]
+                if not (type(left) == float and type(right) == float):
+                    raise RuntimeException(constants[code[ip + 1]], "Operands must be a number.")
+                stack[-1] = left * right
+                ip += 2
+            elif op == DIVIDE:
+                right = pop()
+                left = stack[-1]
+                if not (type(left) == float and type(right) == float):
+                    raise RuntimeException(constants[code[ip + 1]], "Operands must be a number.")
+                stack[-1] = left / right
+                ip += 2
+            elif op == MODULO:
+                right = pop()
+                left = stack[-1]
+                if not (type(left) == float and type(right) == float):
+                    raise RuntimeException(constants[code[ip + 1]], "Operands must be a number.")
+                stack[-1] = left % right
+                ip += 2
+            elif op == GREATER:
+                right = pop()
+                left = stack[-1]
+                if not (type(left) == float and type(right) == float):
+                    raise RuntimeException(constants[code[ip + 1]], "Operands must be a number.")
+                stack[-1] = left > right
+                ip += 2
+            elif op == GREATER_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if not (type(left) == float and type(right) == float):
+                    raise RuntimeException(constants[code[ip + 1]], "Operands must be a number.")
+                stack[-1] = left >= right
+                ip += 2
+            elif op == LESS_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if not (type(left) == float and type(right) == float):
+                    raise RuntimeException(constants[code[ip + 1]], "Operands must be a number.")
+                stack[-1] = left <= right
+                ip += 2
+            elif op == EQUAL:
+                right = pop()
+                stack[-1] = is_equal(stack[-1], right)
+                ip += 1
+            elif op == NOT_EQUAL:
+                right = pop()
+                stack[-1] = not is_equal(stack[-1], right)
+                ip += 1
+            elif op == NIL:
+                push(None)
+                ip += 1
+            elif op == TRUE:
+                push(True)
+                ip += 1
+            elif op == FALSE:
+                push(False)
+                ip += 1
+            elif op == AND_JUMP:
+                if is_truthy(stack[-1]):
+                    pop()
+                    ip += 2
+                else:
+                    ip = code[ip + 1]
+            elif op == OR_JUMP:
+                if is_truthy(stack[-1]):
+                    ip = code[ip + 1]
+                else:
+                    pop()
+                    ip += 2
+            elif op == NOT:
+                stack[-1] = not is_truthy(stack[-1])
+                ip += 1
+            elif op == NEGATE:
+                if not type(stack[-1]) == float:
+                    raise RuntimeException(constants[code[ip + 1]], "Operand must be a number.")
+                stack[-1] = -stack[-1]
+                ip += 2
+            elif op == PRINT:
+                write_line(stringify(pop()))
+                ip += 1
+            elif op == DEFINE:
+                environment.define(constants[code[ip + 1]], pop())
+                ip += 2
+            elif op == SET_GLOBAL:
+                globals.assign(constants[code[ip + 1]], stack[-1])
+                ip += 2
+            elif op == GET_SUPER:
+                distance = code[ip + 1]
+                method_name = constants[code[ip + 3]]
+                superclass = environment.get_at(distance, code[ip + 2])
+                object = environment.get_at(distance - 1, 0)
+
+                method = superclass.find_method(method_name.lexem)
+                if method is None:
+                    raise RuntimeException(method_name, f"Undefined property {method_name.lexem}.")
+
+                push(object.bind(method))
+                ip += 4
+            elif op == GET_METHOD:
+                object = stack[-1]
+                site = constants[code[ip + 1]]
+                if type(object) is LoxInstance:
+                    if not object.shape is site.cache_shape:
+                        object.fill_cache(site)
+                    if site.cache_method is None:
+                        stack[-1] = object.values[site.cache_field]
+                        push(None)
+                    else:
+                        stack[-1] = site.cache_method
+                        push(object)
+                elif isinstance(object, NativeObject):
+                    stack[-1] = object.get(site.name)
+                    push(None)
+                else:
+                    raise RuntimeException(site.name, "Only instances have properties.")
+                ip += 2
+            elif op == GET_SUPER_METHOD:
+                distance = code[ip + 1]
+                method_name = constants[code[ip + 3]]
+                superclass = environment.get_at(distance, code[ip + 2])
+                object = environment.get_at(distance - 1, 0)
+
+                method = superclass.find_method(method_name.lexem)
+                if method is None:
+                    raise RuntimeException(method_name, f"Undefined property {method_name.lexem}.")
+
+                push(method)
+                push(object)
+                ip += 4
+            elif op == CLOSURE:
+                push(VMFunction(constants[code[ip + 1]], environment, False))
+                ip += 2
+            elif op == CLASS:
+                proto = constants[code[ip + 1]]
+                declaration = proto.declaration
+
+                superclass = None
+                if declaration.superclass is not None:
+                    superclass = pop()
+                    if not type(superclass) == LoxClass:
+                        raise RuntimeException(declaration.superclass.name, "Superclass must be a class.")
+
+                method_environment = environment
+                if superclass is not None:
+                    method_environment = Environment(environment, [superclass])
+
+                methods = {}
+                for method, is_init in proto.methods:
+                    methods[method.declaration.name.lexem] = VMFunction(method, method_environment, is_init)
+
+                environment.define(declaration.name.lexem, LoxClass(declaration.name.lexem, superclass, methods))
+                ip += 2
+            else:
+                raise RuntimeError(f"Unknown opcode {op}.")
@@ -3,39 +3,86 @@
 # https://craftinginterpreters.com/contents.html
 
 import sys
+import argparse
 from LoxErrors import GlobalErrors
+from LoxErrors.Error import global_errors
 from Lox.Parser import Parser
 from Lox.Resolver import Resolver
+from Lox.Optimizer import Optimizer
 from Lox.Interpreter import Interpreter
-from Lox.Scanner import Scanner
+from Lox.FastScanner import FastScanner, read_chunks
+from Lox.LoxSession import ENGINES, SCANNERS, load_program
+from Lox.ProgramCache import ProgramCache, MAX_CACHE_SIZE
+from Lox.Output import Output, DEFAULT_BUFFER_SIZE
+from Lox.Profiler import ProfilingInterpreter
+from Lox.Stats import StatsInterpreter
 
 
 interpreter = Interpreter()
+scanner_class = FastScanner
+optimize = True
 
 
 def run(source):
-    scanner = Scanner(source)
-    tokens = scanner.scan_tokens()
+    statements = load(source)
+    if statements is not None:
+        interpreter.interpret(statements)
 
-    parser = Parser(tokens)
-    statements = parser.parse()
 
-    if GlobalErrors.had_error or GlobalErrors.had_runtime_error or statements[0] is None:
-        return
-    else:
-        resolver = Resolver(interpreter)
-        resolver.resolve(statements)
+def load(source):
+    return load_program(source, scanner_class, optimize)
+
 
-        if GlobalErrors.had_error or GlobalErrors.had_runtime_error:
+def run_cached(filename, source, cache_size):
+    # Like run, but reuses the resolved program from an earlier run of the
+    # same source when the cache has one.
+    cache = ProgramCache(filename, cache_size)
+    statements = cache.load(source)
+    if statements is None:
+        statements = load(source)
+        if statements is None:
             return
+        cache.store(source, statements)
+
+    interpreter.interpret(statements)
 
-        interpreter.interpret(statements)
 
+def run_stream(file):
+    # Each top-level declaration is resolved and run as soon as it has been
+    # parsed, while the rest of the file is still unread. After an error
+    # nothing more runs, but parsing carries on to report later errors.
+    # Output is left to fill the buffer across declarations and flushed
+    # once at the end.
+    tokens = FastScanner(read_chunks(file)).stream_tokens()
+    resolver = Resolver()
+    optimizer = Optimizer()
 
-def run_file(filename):
+    try:
+        for statement in Parser(tokens).declarations():
+            if GlobalErrors.had_error or statement is None:
+                continue
+
+            statements = [statement]
+            resolver.resolve(statements)
+            if not GlobalErrors.had_error:
+                if optimize:
+                    statements = optimizer.optimize(statements)
+                interpreter.interpret(statements, flush=False)
+
+            if GlobalErrors.had_runtime_error:
+                return
+    finally:
+        interpreter.output.flush()
+
+
+def run_file(filename, stream=False, cache_size=None):
     with open(filename, 'r') as file:
-        code = file.read()
-        run(code)
+        if stream:
+            run_stream(file)
+        elif cache_size:
+            run_cached(filename, file.read(), cache_size)
+        else:
+            run(file.read())
 
         if GlobalErrors.had_error:
             sys.exit(65)
@@ -51,8 +98,65 @@ def run_prompt():
 
 
 def main():
-    if len(sys.argv) > 1:
-        run_file(sys.argv[1])
+    global interpreter, scanner_class, optimize
+
+    arg_parser = argparse.ArgumentParser(description='A Lox interpreter written in python.')
+    arg_parser.add_argument('script', nargs='?', help='Lox file to run; starts the repl when omitted')
+    arg_parser.add_argument('--engine', choices=ENGINES.keys(), default='interpreter',
+                            help='execution engine: the tree-walking interpreter, the bytecode vm or the closure compiler')
+    arg_parser.add_argument('--scanner', choices=SCANNERS.keys(), default='fast',
+                            help='scanner: the regex-based one or the original character-at-a-time one')
+    arg_parser.add_argument('--stream', action='store_true',
+                            help='run each declaration as soon as it is parsed instead of reading the whole file first')
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help='always scan, parse and resolve the script instead of using __loxcache__')
+    arg_parser.add_argument('--cache-size', type=float, default=MAX_CACHE_SIZE / (1024 * 1024),
+                            help='megabytes __loxcache__ may use before old entries are evicted')
+    arg_parser.add_argument('--no-optimize', action='store_true',
+                            help='run the program as parsed, without constant folding; also skips the cache')
+    arg_parser.add_argument('--buffer-size', type=int, default=DEFAULT_BUFFER_SIZE,
+                            help='characters of printed output to collect before writing them; 0 writes each line at once')
+    arg_parser.add_argument('--profile', action='store_true',
+                            help='time each function and line of the script and print a report to stderr')
+    arg_parser.add_argument('--profile-stacks', metavar='FILE',
+                            help='profile the script and write its call stacks to FILE in collapsed flamegraph format')
+    arg_parser.add_argument('--stats', action='store_true',
+                            help='count the nodes, environments, instances, bound methods and returns the script runs '
+                                 'and print them to stderr')
+    args = arg_parser.parse_args()
+
+    if args.stream and args.scanner != 'fast':
+        arg_parser.error('--stream needs the fast scanner')
+
+    profile = args.profile or args.profile_stacks is not None
+    if (profile or args.stats) and (args.engine != 'interpreter' or args.script is None):
+        arg_parser.error('--profile and --stats need a script run on the interpreter engine')
+    if profile and args.stats:
+        arg_parser.error('--profile and --stats cannot be used together')
+
+    if profile:
+        engine = ProfilingInterpreter
+    elif args.stats:
+        engine = StatsInterpreter
+    else:
+        engine = ENGINES[args.engine]
+    interpreter = engine(Output(buffer_size=args.buffer_size))
+    global_errors.output = interpreter.output
+    scanner_class = SCANNERS[args.scanner]
+    optimize = not args.no_optimize
+
+    if args.script is not None:
+        cache_size = None if args.no_cache or args.no_optimize else int(args.cache_size * 1024 * 1024)
+        try:
+            run_file(args.script, args.stream, cache_size)
+        finally:
+            if args.profile:
+                interpreter.report()
+            if args.profile_stacks is not None:
+                with open(args.profile_stacks, 'w') as file:
+                    interpreter.write_collapsed_stacks(file)
+            if args.stats:
+                interpreter.stats.report()
     else:
         run_prompt()
 
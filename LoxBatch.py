@@ -0,0 +1,127 @@
+# Runs many Lox scripts across a pool of worker processes and writes one JSON
+# report of their output and exit codes.
+#
+#     python3 LoxBatch.py [--jobs N] [--engine NAME] [--report FILE] directory-or-manifest
+#
+# A directory is searched recursively for files matching --pattern. Any other
+# path is read as a manifest listing one script per line, relative to the
+# manifest; blank lines and lines starting with '#' are skipped.
+
+import argparse
+import glob
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from Lox.LoxSession import LoxSession, ENGINES, SCANNERS
+
+
+def find_scripts(path, pattern):
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, '**', pattern), recursive=True))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    scripts = []
+    with open(path, 'r') as manifest:
+        for line in manifest:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                scripts.append(os.path.join(directory, line))
+    return scripts
+
+
+# LoxSession options, the same for every script in the batch.
+session_options = {}
+
+
+def configure(options):
+    # Runs once in each worker, before its first script. Scripts get no
+    # input: read() in one fails rather than competing for the terminal.
+    session_options.update(options)
+    sys.stdin = open(os.devnull, 'r')
+
+
+def run_script(script):
+    # Runs one script in a session of its own, capturing everything it and
+    # its error messages print, and returns its result for the report.
+    output = io.StringIO()
+    exit_code = 70
+    error = None
+
+    start = time.perf_counter()
+    try:
+        with open(script, 'r') as file:
+            source = file.read()
+        exit_code = LoxSession(output, **session_options).run(source)
+    except OSError as exception:
+        error = str(exception)
+    except EOFError:
+        error = 'read() called with no input'
+    except Exception:
+        # A failure of the interpreter itself rather than of the script.
+        error = traceback.format_exc()
+    elapsed = time.perf_counter() - start
+
+    result = {
+        'script': script,
+        'exit_code': exit_code,
+        'stdout': output.getvalue(),
+        'seconds': elapsed,
+    }
+    if error is not None:
+        result['error'] = error
+    return result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Run many Lox scripts in parallel.')
+    arg_parser.add_argument('path', help='directory of scripts, or a manifest file listing one script per line')
+    arg_parser.add_argument('--pattern', default='*.lox', help='file names to run from a directory (default: *.lox)')
+    arg_parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                            help='worker processes (default: one per CPU)')
+    arg_parser.add_argument('--engine', choices=ENGINES.keys(), default='interpreter',
+                            help='execution engine to run every script on')
+    arg_parser.add_argument('--scanner', choices=SCANNERS.keys(), default='fast',
+                            help='scanner to use')
+    arg_parser.add_argument('--no-optimize', action='store_true', help='run each script as parsed')
+    arg_parser.add_argument('--report', metavar='FILE', help='write the JSON report to FILE instead of stdout')
+    args = arg_parser.parse_args()
+
+    scripts = find_scripts(args.path, args.pattern)
+    jobs = max(1, args.jobs or 1)
+    # Hand scripts out a few at a time so that thousands of short ones do
+    # not each cost a round trip to a worker.
+    chunk_size = max(1, len(scripts) // (jobs * 4))
+
+    start = time.perf_counter()
+    options = {'engine': args.engine, 'scanner': args.scanner, 'optimize': not args.no_optimize}
+    with ProcessPoolExecutor(jobs, initializer=configure, initargs=(options,)) as pool:
+        results = list(pool.map(run_script, scripts, chunksize=chunk_size))
+    elapsed = time.perf_counter() - start
+
+    failed = sum(1 for result in results if result['exit_code'] != 0)
+    report = {
+        'jobs': jobs,
+        'engine': args.engine,
+        'scripts': len(results),
+        'failed': failed,
+        'seconds': elapsed,
+        'results': results,
+    }
+
+    if args.report is None:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(args.report, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    sys.stderr.write(f'{len(results)} scripts, {failed} failed, {elapsed:.2f}s on {jobs} workers\n')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,19 +3,61 @@ from Lox.TokenType import TokenType
 
 
 class Error:
-    @classmethod
-    def report(cls, line, position, message):
-        GlobalErrors.had_error = True
-        print(f'[line {line}] Error{position}: {message}')
+    # Reports the errors of one program and records whether there were any.
+    # Messages are printed to stream, or without one to whatever sys.stdout
+    # is at the time. The scanner, parser, resolver and engines each take
+    # one, and use global_errors when not given one.
+    #
+    # Given the Output a program prints to, messages are written after
+    # whatever it still holds, so they follow the lines printed before them.
+    def __init__(self, stream=None, output=None):
+        self.stream = stream
+        self.output = output
+        self.had_error = False
+        self.had_runtime_error = False
 
-    @classmethod
-    def error(cls, token, message):
+    def reset(self):
+        self.had_error = False
+        self.had_runtime_error = False
+
+    def report(self, line, position, message):
+        self.had_error = True
+        self.print(f'[line {line}] Error{position}: {message}')
+
+    def error(self, token, message):
         if token.type == TokenType.EOF:
-            cls.report(token.line, " at end", message)
+            self.report(token.line, " at end", message)
         else:
-            cls.report(token.line, f" at '{token.lexem}'", message)
+            self.report(token.line, f" at '{token.lexem}'", message)
+
+    def runtime_error(self, error):
+        self.had_runtime_error = True
+        self.print(f'{error.__str__()}\n[line {error.token.line}]')
+
+    def print(self, message):
+        if self.output is not None:
+            self.output.flush()
+        print(message, file=self.stream)
+
+
+class GlobalError(Error):
+    # Keeps its flags in the GlobalErrors module, where LoxBase and the
+    # benchmarks look for them.
+    @property
+    def had_error(self):
+        return GlobalErrors.had_error
+
+    @had_error.setter
+    def had_error(self, value):
+        GlobalErrors.had_error = value
+
+    @property
+    def had_runtime_error(self):
+        return GlobalErrors.had_runtime_error
+
+    @had_runtime_error.setter
+    def had_runtime_error(self, value):
+        GlobalErrors.had_runtime_error = value
+
 
-    @classmethod
-    def runtime_error(cls, error):
-        GlobalErrors.had_runtime_error = True
-        print(f'{error.__str__()}\n[line {error.token.line}]')
+global_errors = GlobalError()
@@ -1,3 +0,0 @@
-class Return(RuntimeError):
-    def __init__(self, value):
-        self.value = value
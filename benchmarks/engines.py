@@ -0,0 +1,118 @@
+# Times each execution engine on the benchmark programs.
+#
+# Run from the repository root:
+#     python -m benchmarks.engines [--repeat N] [--engine NAME ...] [--no-optimize] [program.lox ...]
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import time
+from LoxErrors import GlobalErrors
+from Lox.Parser import Parser
+from Lox.Resolver import Resolver
+from Lox.Optimizer import Optimizer
+from Lox.FastScanner import FastScanner
+from Lox.Output import Output
+from Lox.LoxSession import ENGINES, load_program
+from LoxErrors.Error import Error
+
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Has every shape the Interpreter fuses into a node of its own, so running it
+# twice checks that interpreting a program leaves it runnable.
+REUSE_PROGRAM = '''
+fun build(n) {
+    var s = "";
+    for (var i = 0; i < n; i = i + 1) {
+        s = s + i + ",";
+    }
+    return s;
+}
+print build(5);
+'''
+
+
+def run_program(source, engine, optimize=True):
+    interpreter = ENGINES[engine]()
+    output = io.StringIO()
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        statements = Parser(FastScanner(source).scan_tokens()).parse()
+        Resolver().resolve(statements)
+        if optimize:
+            statements = Optimizer().optimize(statements)
+        interpreter.interpret(statements)
+    elapsed = time.perf_counter() - start
+
+    failed = GlobalErrors.had_error or GlobalErrors.had_runtime_error
+    GlobalErrors.had_error = False
+    GlobalErrors.had_runtime_error = False
+    return elapsed, output.getvalue(), failed
+
+
+def check_reuse(source):
+    # Runs one loaded program twice on the interpreter and then on every
+    # other engine, which must all print the same.
+    errors = Error(io.StringIO())
+    statements = load_program(source, errors=errors)
+    runs = ['interpreter'] + list(ENGINES.keys())
+    outputs = []
+    for engine in runs:
+        output = io.StringIO()
+        ENGINES[engine](Output(output), errors).interpret(statements)
+        outputs.append(output.getvalue())
+    if errors.had_error or errors.had_runtime_error:
+        raise SystemExit(f'rerunning a loaded program failed:\n{errors.stream.getvalue()}')
+    for engine, output in zip(runs, outputs):
+        if output != outputs[0]:
+            raise SystemExit(f'rerunning a loaded program on the {engine} engine printed {output!r}, not {outputs[0]!r}')
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Compare Lox execution engines.')
+    arg_parser.add_argument('programs', nargs='*', help='Lox files to run; defaults to benchmarks/*.lox')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='runs per program and engine; the best is kept')
+    arg_parser.add_argument('--engine', action='append', choices=ENGINES.keys(), dest='engines',
+                            help='engine to time; may be given more than once (default: all)')
+    arg_parser.add_argument('--no-optimize', action='store_true', help='skip constant folding')
+    args = arg_parser.parse_args()
+
+    programs = args.programs or sorted(glob.glob(os.path.join(BENCHMARK_DIR, '*.lox')))
+    engines = args.engines or list(ENGINES.keys())
+    baseline = engines[0]
+
+    check_reuse(REUSE_PROGRAM)
+
+    print(f'{"program":<24}' + ''.join(f'{engine:>15}' for engine in engines))
+    for program in programs:
+        with open(program, 'r') as file:
+            source = file.read()
+
+        times = {}
+        outputs = {}
+        for engine in engines:
+            best = None
+            for _ in range(args.repeat):
+                elapsed, outputs[engine], failed = run_program(source, engine, not args.no_optimize)
+                if failed:
+                    raise SystemExit(f'{program} failed on the {engine} engine:\n{outputs[engine]}')
+                best = elapsed if best is None else min(best, elapsed)
+            times[engine] = best
+
+        for engine in engines:
+            if outputs[engine] != outputs[baseline]:
+                raise SystemExit(f'{program}: {engine} output differs from {baseline}')
+
+        row = f'{os.path.basename(program):<24}'
+        for engine in engines:
+            speedup = times[baseline] / times[engine]
+            row += f'{times[engine]:>8.3f}s {speedup:>4.1f}x'
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# Measures the heap cost of scanning, parsing and running a large generated
+# Lox program.
+#
+# Run from the repository root:
+#     python -m benchmarks.memory [--units N] [--engine NAME] [--stream]
+#
+# With --stream the program is read back from a temporary file and each
+# declaration is run as soon as it is parsed, as 'LoxBase.py --stream' does.
+
+import argparse
+import contextlib
+import gc
+import io
+import tempfile
+import tracemalloc
+from LoxErrors import GlobalErrors
+from Lox.Parser import Parser
+from Lox.Resolver import Resolver
+from Lox.FastScanner import FastScanner, read_chunks
+from Lox.LoxSession import ENGINES
+
+
+UNIT = '''
+fun function{i}(a, b) {{
+    var c = a + b * {i};
+    if (c > 10) {{
+        return c - 1;
+    }}
+    return c;
+}}
+
+class Class{i} {{
+    init(x) {{
+        this.x = x;
+        this.y = x * 2;
+    }}
+
+    total() {{
+        return this.x + this.y + {i};
+    }}
+}}
+
+var value{i} = function{i}(1, 2) + Class{i}({i}).total();
+'''
+
+
+def generate(units):
+    return ''.join(UNIT.format(i=i) for i in range(units))
+
+
+def megabytes(size):
+    return f'{size / (1024 * 1024):8.2f} MB'
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Measure Lox memory use on a generated program.')
+    arg_parser.add_argument('--units', type=int, default=2000, help='function/class groups to generate')
+    arg_parser.add_argument('--engine', choices=ENGINES.keys(), default='interpreter')
+    arg_parser.add_argument('--stream', action='store_true', help='stream the program from a file')
+    args = arg_parser.parse_args()
+
+    source = generate(args.units)
+    print(f'source: {source.count(chr(10))} lines, {len(source)} characters')
+
+    if args.stream:
+        with tempfile.TemporaryFile('w+') as file:
+            file.write(source)
+            file.seek(0)
+            del source
+            measure_stream(file, args.engine)
+        return
+
+    gc.collect()
+    tracemalloc.start()
+
+    tokens = FastScanner(source).scan_tokens()
+    scanned = tracemalloc.get_traced_memory()[0]
+
+    statements = Parser(tokens).parse()
+    parsed = tracemalloc.get_traced_memory()[0]
+
+    Resolver().resolve(statements)
+    interpreter = ENGINES[args.engine]()
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter.interpret(statements)
+    ran, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if GlobalErrors.had_error or GlobalErrors.had_runtime_error:
+        raise SystemExit('the generated program failed')
+
+    print(f'{len(tokens)} tokens')
+    print(f'after scan:   {megabytes(scanned)}')
+    print(f'after parse:  {megabytes(parsed)}')
+    print(f'after run:    {megabytes(ran)}')
+    print(f'peak:         {megabytes(peak)}')
+
+
+def measure_stream(file, engine):
+    gc.collect()
+    tracemalloc.start()
+
+    interpreter = ENGINES[engine]()
+    resolver = Resolver()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for statement in Parser(FastScanner(read_chunks(file)).stream_tokens()).declarations():
+            resolver.resolve([statement])
+            interpreter.interpret([statement])
+    ran, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if GlobalErrors.had_error or GlobalErrors.had_runtime_error:
+        raise SystemExit('the generated program failed')
+
+    print(f'after run:    {megabytes(ran)}')
+    print(f'peak:         {megabytes(peak)}')
+
+
+if __name__ == '__main__':
+    main()
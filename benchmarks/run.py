@@ -0,0 +1,157 @@
+# Times the phases LoxBase.run goes through, separately, on the benchmark
+# programs: scanning, parsing, resolving, optimizing and interpreting (which
+# includes whatever compiling the engine does). Each program runs --repeat
+# times per configuration and the best and median times are kept.
+#
+# A configuration is an engine optionally followed by ':classic' for the
+# original scanner and ':no-optimize' to skip the optimizer, e.g.
+# 'vm:no-optimize'. Given two, the second is compared against the first.
+#
+# Run from the repository root:
+#     python -m benchmarks.run [--repeat N] [--config CONFIG [--config CONFIG]] [--json FILE] [program.lox ...]
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import statistics
+import time
+from LoxErrors import GlobalErrors
+from Lox.Parser import Parser
+from Lox.Resolver import Resolver
+from Lox.Optimizer import Optimizer
+from Lox.Output import Output
+from Lox.LoxSession import ENGINES, SCANNERS
+
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PHASES = ('scan', 'parse', 'resolve', 'optimize', 'interpret')
+
+
+def parse_config(text):
+    engine, *options = text.split(':')
+    if engine not in ENGINES:
+        raise argparse.ArgumentTypeError(f'unknown engine {engine!r}')
+    for option in options:
+        if option not in ('classic', 'no-optimize'):
+            raise argparse.ArgumentTypeError(f'unknown option {option!r}')
+
+    return {
+        'name': text,
+        'engine': engine,
+        'scanner': 'classic' if 'classic' in options else 'fast',
+        'optimize': 'no-optimize' not in options,
+    }
+
+
+def run_phases(source, config):
+    # Returns the time of each phase, the program's output and whether it
+    # reported an error.
+    times = {}
+    output = io.StringIO()
+    interpreter = ENGINES[config['engine']](Output(output))
+
+    with contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        tokens = SCANNERS[config['scanner']](source).scan_tokens()
+        times['scan'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        statements = Parser(tokens).parse()
+        times['parse'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        Resolver().resolve(statements)
+        times['resolve'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if config['optimize']:
+            statements = Optimizer().optimize(statements)
+        times['optimize'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        interpreter.interpret(statements)
+        times['interpret'] = time.perf_counter() - start
+
+    failed = GlobalErrors.had_error or GlobalErrors.had_runtime_error
+    GlobalErrors.had_error = False
+    GlobalErrors.had_runtime_error = False
+    return times, output.getvalue(), failed
+
+
+def measure(program, source, config, repeat):
+    runs = {phase: [] for phase in PHASES + ('total',)}
+    output = None
+    for _ in range(repeat):
+        times, output, failed = run_phases(source, config)
+        if failed:
+            raise SystemExit(f'{program} failed with {config["name"]}:\n{output}')
+        for phase in PHASES:
+            runs[phase].append(times[phase])
+        runs['total'].append(sum(times.values()))
+
+    summary = {phase: {'best': min(times), 'median': statistics.median(times), 'runs': times}
+               for phase, times in runs.items()}
+    return summary, output
+
+
+def print_row(label, cells):
+    print(f'{label:<40}' + ''.join(f'{cell:>11}' for cell in cells))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Time each phase of running the Lox benchmarks.')
+    arg_parser.add_argument('programs', nargs='*', help='Lox files to run; defaults to benchmarks/*.lox')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='runs per program and configuration')
+    arg_parser.add_argument('--config', action='append', type=parse_config, dest='configs',
+                            help="engine[:classic][:no-optimize]; give two to compare them (default: interpreter)")
+    arg_parser.add_argument('--json', metavar='FILE', help='also write every timing to FILE as JSON')
+    args = arg_parser.parse_args()
+
+    configs = args.configs or [parse_config('interpreter')]
+    if len(configs) > 2:
+        arg_parser.error('at most two configurations can be compared')
+    if len(configs) == 2 and configs[0]['name'] == configs[1]['name']:
+        arg_parser.error('the two configurations are the same')
+    programs = args.programs or sorted(glob.glob(os.path.join(BENCHMARK_DIR, '*.lox')))
+
+    results = {}
+    print_row(f'program and config, best of {args.repeat}', PHASES + ('total',))
+    for program in programs:
+        with open(program, 'r') as file:
+            source = file.read()
+
+        name = os.path.basename(program)
+        results[name] = {}
+        outputs = {}
+        for config in configs:
+            summary, outputs[config['name']] = measure(program, source, config, args.repeat)
+            results[name][config['name']] = summary
+            print_row(f'{name} {config["name"]}',
+                      [f'{summary[phase]["best"]:.4f}s' for phase in PHASES + ('total',)])
+
+        if len(configs) == 2:
+            first, second = (results[name][config['name']] for config in configs)
+            if outputs[configs[0]['name']] != outputs[configs[1]['name']]:
+                raise SystemExit(f'{name}: output differs between {configs[0]["name"]} and {configs[1]["name"]}')
+            # How many times faster the second configuration is.
+            print_row(f'{name} speedup', [f'{first[phase]["best"] / second[phase]["best"]:.2f}x'
+                                          if second[phase]['best'] else '-' for phase in PHASES + ('total',)])
+
+    if args.json:
+        report = {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'repeat': args.repeat,
+            'configs': configs,
+            'results': results,
+        }
+        with open(args.json, 'w') as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
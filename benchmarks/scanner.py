@@ -0,0 +1,99 @@
+# Checks that FastScanner produces exactly the tokens and errors of the
+# original Scanner, whole and when streamed in small chunks, then times
+# both on a multi-megabyte source.
+#
+# Run from the repository root:
+#     python -m benchmarks.scanner [--size MB] [--repeat N] [file.lox ...]
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import time
+from LoxErrors import GlobalErrors
+from Lox.FastScanner import FastScanner
+from Lox.Scanner import Scanner
+
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Lexemes at the edges of each rule: numbers next to dots, comments at the
+# end of the input, strings across lines, keywords used as prefixes and
+# characters Lox does not accept.
+EDGE_CASES = [
+    '', '1', '1.', '1.5', '.5', '1.2.3', 'a.b', 'x1_y', '_', 'orchid', 'and_', 'classy', 'nil',
+    '!', '!=', '!==', '<=>', '>==', '=', '/', '//', '// comment', 'a // comment\nb', '/ /',
+    '"a"', '""', '"multi\nline\nstring" x', '"unterminated', '"unterminated\nover lines',
+    '@', '#x$', 'a\tb\r\nc', 'var s = "é";', 'var é = 1;', '\n\n\n}',
+    'print 1; ', 'print 2;\t', 'a \r', '  ', 'x // c \t', '"s" \t \r',
+]
+
+
+def scan(scanner_class, source, chunk_size=None):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        if chunk_size is None:
+            tokens = scanner_class(source).scan_tokens()
+        else:
+            chunks = [source[i:i + chunk_size] for i in range(0, len(source), chunk_size)]
+            tokens = list(scanner_class(chunks).stream_tokens())
+    had_error = GlobalErrors.had_error
+    GlobalErrors.had_error = False
+    return [(token.type, token.lexem, token.literal, token.line) for token in tokens], output.getvalue(), had_error
+
+
+def check(source, label, chunk_sizes=(1, 7, 4096)):
+    expected = scan(Scanner, source)
+    actual = scan(FastScanner, source)
+    if actual != expected:
+        raise SystemExit(f'{label}: FastScanner differs from Scanner\n'
+                         f'expected: {expected}\nactual:   {actual}')
+
+    for chunk_size in chunk_sizes:
+        if scan(FastScanner, source, chunk_size) != expected:
+            raise SystemExit(f'{label}: FastScanner differs from Scanner when streamed in {chunk_size} character chunks')
+
+
+def best_time(scanner_class, source, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        scanner_class(source).scan_tokens()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Compare the Lox scanners.')
+    arg_parser.add_argument('files', nargs='*', help='Lox files to check; defaults to benchmarks/*.lox')
+    arg_parser.add_argument('--size', type=float, default=2.0, help='size of the timed source in megabytes')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='runs per scanner; the best is kept')
+    args = arg_parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(BENCHMARK_DIR, '*.lox')))
+    sources = []
+    for name in files:
+        with open(name, 'r') as file:
+            sources.append(file.read())
+
+    for index, case in enumerate(EDGE_CASES):
+        check(case, f'edge case {index} {case!r}')
+    for name, source in zip(files, sources):
+        check(source, name)
+    print(f'{len(EDGE_CASES)} edge cases and {len(files)} files scan identically')
+
+    sample = '\n'.join(sources)
+    source = sample * max(1, int(args.size * 1024 * 1024 / len(sample)))
+    check(source, 'timed source', ())
+
+    classic = best_time(Scanner, source, args.repeat)
+    fast = best_time(FastScanner, source, args.repeat)
+    print(f'{len(source) / (1024 * 1024):.2f} MB, {source.count(chr(10))} lines')
+    print(f'{"Scanner":<12}{classic:>8.3f}s')
+    print(f'{"FastScanner":<12}{fast:>8.3f}s {classic / fast:>6.1f}x')
+
+
+if __name__ == '__main__':
+    main()